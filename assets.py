@@ -0,0 +1,60 @@
+import pygame
+import time
+
+
+class AssetManager(object):
+    # loads every image once and hands out the same surface to every game, converted to the window's pixel format
+    # so blits don't convert every pixel, shared surfaces must never be drawn on
+    def __init__(self):
+        self.images = {}  # path: surface
+        self.converted = set()  # paths whose surface is in the window's pixel format
+        self.load_times = {}  # path: seconds spent loading and converting
+        self.scaled_images = {}  # (surface, scale): the surface scaled, made the first time it's drawn at that scale
+
+    def image(self, path):
+        surface = self.images.get(path)
+        if surface is not None and (path in self.converted or pygame.display.get_surface() is None):
+            return surface
+        start = time.perf_counter()
+        if surface is None:
+            surface = pygame.image.load(path)
+        if pygame.display.get_surface() is not None:  # converting needs a window, headless keeps the file's format
+            if surface.get_flags() & pygame.SRCALPHA:
+                surface = surface.convert_alpha()
+            else:
+                surface = surface.convert()
+            self.converted.add(path)
+        self.images[path] = surface
+        self.load_times[path] = self.load_times.get(path, 0) + time.perf_counter() - start
+        return surface
+
+    def scaled(self, surface, scale):  # surface resized by scale, scaled once and kept like the images themselves
+        if scale == 1:
+            return surface
+        key = (surface, scale)
+        scaled = self.scaled_images.get(key)
+        if scaled is None:
+            size = (max(1, round(surface.get_width() * scale)), max(1, round(surface.get_height() * scale)))
+            if surface.get_bitsize() >= 24:
+                scaled = pygame.transform.smoothscale(surface, size)
+            else:  # smoothscale only works on 24 and 32 bit surfaces
+                scaled = pygame.transform.scale(surface, size)
+            self.scaled_images[key] = scaled
+        return scaled
+
+    def report(self):  # lines of how long each image took to load, slowest first
+        lines = []
+        for path, seconds in sorted(self.load_times.items(), key=lambda item: item[1], reverse=True):
+            converted = 'converted' if path in self.converted else 'not converted'
+            lines.append(f'{seconds * 1000:7.2f} ms  {path} ({converted})')
+        lines.append(f'{sum(self.load_times.values()) * 1000:7.2f} ms  total, {len(self.images)} images')
+        return lines
+
+    def clear(self):
+        self.images.clear()
+        self.converted.clear()
+        self.load_times.clear()
+        self.scaled_images.clear()
+
+
+assets = AssetManager()
@@ -0,0 +1,138 @@
+import hashlib
+import os
+import pygame
+import threading
+import time
+
+
+# how much a sound matters when every channel is taken, a sound can only cut off a less important one
+PRIORITY_CHAT = 0  # saves and other quick chat reactions
+PRIORITY_CLOCK = 1  # time remaining callouts
+PRIORITY_GOAL = 2
+PRIORITY_MATCH = 3  # begin, overtime, match over
+
+ANNOUNCEMENT_FILES = {'begin': 'sounds/neo tokyo begin game.mp3',
+                      'save 1': 'sounds/neo tokyo save 1.mp3',
+                      'save 3': 'sounds/neo tokyo save 3.mp3',
+                      'save 4': 'sounds/neo tokyo save 4.mp3',
+                      'save 5': 'sounds/neo tokyo save 5.mp3',
+                      'epic save 1': 'sounds/neo tokyo epic save 1.mp3',
+                      'epic save 2': 'sounds/neo tokyo epic save 2.mp3',
+                      'epic save 3': 'sounds/neo tokyo epic save 3.mp3',
+                      'goal 1': 'sounds/neo tokyo goal 1.mp3',
+                      'goal 2': 'sounds/neo tokyo goal 2.mp3',
+                      'goal 3': 'sounds/neo tokyo goal 3.mp3',
+                      'goal 4': 'sounds/neo tokyo goal 4.mp3',
+                      'goal 5': 'sounds/neo tokyo goal 5.mp3',
+                      'goal 6': 'sounds/neo tokyo goal 6.mp3',
+                      '60s remaining': 'sounds/champions field 60 seconds remaining.mp3',
+                      '30s remaining': 'sounds/champions field 30 seconds remaining.mp3',
+                      'overtime': 'sounds/overtime.mp3',
+                      'match over': 'sounds/neo tokyo match over.mp3'}
+
+
+class AudioBank(object):
+    # decodes a set of sounds once per process on a background thread, so the menu doesn't wait for them,
+    # and plays them on its own few mixer channels
+    def __init__(self, files, channels=4, cache_folder=None):
+        self.files = files  # name: path
+        self.cache_folder = cache_folder  # decoded samples are saved here so the next start skips decoding
+        self.channel_count = channels
+        self.sounds = {}  # name: decoded sound, filled in by the loading thread
+        self.loaded = threading.Event()  # set once the loading thread is done, even if it failed
+        self.error = None  # what stopped the loading thread, raised again by wait
+        self.thread = None
+        self.load_seconds = 0.0
+        self.channels = []  # the first channels of the mixer, kept away from Sound.play
+        self.channel_priorities = []  # priority of what each channel is playing
+        self.last_played = {}  # name: time it was last started, a sound isn't restarted while it's still playing
+
+    def load(self):  # starts decoding in the background, only the first call does anything
+        if self.thread is not None:
+            return
+        if not pygame.mixer.get_init():
+            pygame.mixer.init()
+        if pygame.mixer.get_num_channels() < self.channel_count + 1:  # leave other sounds at least one channel
+            pygame.mixer.set_num_channels(self.channel_count + 1)
+        pygame.mixer.set_reserved(self.channel_count)
+        self.channels = [pygame.mixer.Channel(i) for i in range(self.channel_count)]
+        self.channel_priorities = [-1] * self.channel_count
+        self.thread = threading.Thread(target=self.load_all, name='audio bank', daemon=True)
+        self.thread.start()
+
+    def wait(self, timeout=None):
+        # blocks until every sound is decoded, returns False on timeout, raises whatever stopped the decoding
+        if not self.loaded.wait(timeout):
+            return False
+        if self.error is not None:
+            raise self.error
+        return True
+
+    def load_all(self):
+        start = time.perf_counter()
+        try:
+            for name, path in self.files.items():
+                self.sounds[name] = self.load_sound(path)
+        except Exception as error:  # a missing or broken file, the main thread raises it in wait
+            self.error = error
+        finally:
+            self.load_seconds = time.perf_counter() - start
+            self.loaded.set()
+
+    def cache_path(self, path):
+        # the cached samples only fit this file as it is now, in the mixer format it was decoded to
+        status = os.stat(path)
+        key = f'{path}|{status.st_size}|{status.st_mtime_ns}|{pygame.mixer.get_init()}'
+        return os.path.join(self.cache_folder, hashlib.sha1(key.encode()).hexdigest() + '.pcm')
+
+    def load_sound(self, path):
+        if self.cache_folder is None:
+            return pygame.mixer.Sound(path)
+        cache_path = self.cache_path(path)
+        try:
+            with open(cache_path, 'rb') as cache_file:
+                return pygame.mixer.Sound(buffer=cache_file.read())
+        except OSError:
+            pass
+        sound = pygame.mixer.Sound(path)
+        try:
+            os.makedirs(self.cache_folder, exist_ok=True)
+            with open(cache_path + '.tmp', 'wb') as cache_file:
+                cache_file.write(sound.get_raw())
+            os.replace(cache_path + '.tmp', cache_path)  # a half written file is never read
+        except OSError:  # no cache is only slower
+            pass
+        return sound
+
+    def is_busy(self):  # if any of the bank's sounds are playing
+        return any(channel.get_busy() for channel in self.channels)
+
+    def play(self, name, priority=PRIORITY_CHAT):
+        # returns the channel it plays on, or None if it isn't loaded yet, was just played or nothing could be cut off
+        sound = self.sounds.get(name)
+        if sound is None:
+            return None
+        now = time.perf_counter()
+        if now - self.last_played.get(name, -sound.get_length()) < sound.get_length():
+            return None  # asked for again while it's still playing, like every frame of the same second
+        chosen = None
+        for i, channel in enumerate(self.channels):
+            if not channel.get_busy():
+                chosen = i
+                break
+        if chosen is None:  # every channel is playing, cut off the least important sound if it matters less
+            lowest = min(range(len(self.channels)), key=lambda i: self.channel_priorities[i])
+            if self.channel_priorities[lowest] >= priority:
+                return None
+            chosen = lowest
+        self.channels[chosen].play(sound)
+        self.channel_priorities[chosen] = priority
+        self.last_played[name] = now
+        return self.channels[chosen]
+
+    def stop(self):
+        for channel in self.channels:
+            channel.stop()
+
+
+announcer = AudioBank(ANNOUNCEMENT_FILES, cache_folder='.audio_cache')
@@ -0,0 +1,354 @@
+from engine import *
+import numpy as np
+
+
+# the same rules as engine.step, but for many independent matches at once
+# every value is a numpy array with one row per match, cars use a second axis: 0 is fennec, 1 is octane
+
+FIELD_W = 1440
+GROUND_TOP = 680
+CEILING_BOTTOM = 75
+WALL_W = 75  # both walls are this wide
+WALL_BOTTOM = 475
+RIGHT_WALL_LEFT = FIELD_W - WALL_W
+
+
+def boxes_touching(l1, t1, w1, h1, l2, t2, w2, h2):  # objects_are_touching for arrays of hitboxes
+    return (l1 + w1 > l2) & (l1 < l2 + w2) & (t1 + h1 > t2) & (t1 < t2 + h2)
+
+
+def hit_bottom_of_wall(left, top, w, vel_y):  # Match.hit_bottom_of_wall for arrays of hitboxes
+    under_wall = (top < WALL_BOTTOM) & (WALL_BOTTOM < top - vel_y)
+    return ((vel_y < 0) & (left < WALL_W) & under_wall) | ((left + w > RIGHT_WALL_LEFT) & under_wall)
+
+
+class BatchArena(object):
+    def __init__(self, n, total_time=45, frame_rate=PHYSICS_BASE_RATE, ball=None, car=None):
+        # ball and car are templates the physical constants are read from
+        # frame_rate is the physics rate, only the rate the constants were tuned for (no dt scaling like Match)
+        if frame_rate != PHYSICS_BASE_RATE:
+            raise ValueError(f'BatchArena only runs at {PHYSICS_BASE_RATE} ticks a second, not {frame_rate}')
+        ball = ball or make_ball()
+        car = car or make_fennec()
+        self.n = n
+        self.total_time = total_time
+        self.frame_rate = frame_rate
+
+        # physics, copied from the templates so the batch plays like engine.step
+        self.radius = ball.radius
+        self.ball_mass = ball.mass
+        self.ball_gravity = ball.gravity
+        self.ball_elasticity = ball.elasticity
+        self.ball_start = (ball.initial_x, ball.initial_y)
+        self.car_w = car.w
+        self.car_h = car.h
+        self.car_mass = car.mass
+        self.car_gravity = car.gravity
+        self.car_friction = car.friction
+        self.car_elasticity = car.elasticity
+        self.thrust = car.thrust
+        self.boost_thrust = car.boost_thrust
+        self.car_start_x = np.array([make_fennec().initial_x, make_octane().initial_x], dtype=np.float64)
+        self.car_start_y = np.array([make_fennec().initial_y, make_octane().initial_y], dtype=np.float64)
+        self.thrust_speed_limit = 15
+        self.boost_speed_limit = 25
+        self.boost_regen_rate = 0.05
+        self.cooldown_length = 5  # ticks before the same pair can hit again
+        self.elastic_collisions = True  # if False, hits lose energy based on the objects' elasticity
+
+        # ball
+        self.ball_x = np.zeros(n)
+        self.ball_y = np.zeros(n)
+        self.ball_vel_x = np.zeros(n)
+        self.ball_vel_y = np.zeros(n)
+        self.ball_force_y = np.zeros(n)  # gravity while falling, nothing while grounded
+        self.ball_grounded = np.zeros(n, dtype=bool)
+
+        # cars
+        self.car_x = np.zeros((n, 2))
+        self.car_y = np.zeros((n, 2))
+        self.car_vel_x = np.zeros((n, 2))
+        self.car_vel_y = np.zeros((n, 2))
+        self.drive_left = np.zeros((n, 2))  # force from driving left
+        self.drive_right = np.zeros((n, 2))  # force from driving right
+        self.boost_force = np.zeros((n, 2))  # force from boosting left or right
+        self.friction_force = np.zeros((n, 2))
+        self.car_force_y = np.zeros((n, 2))  # gravity while falling, nothing while grounded
+        self.car_grounded = np.zeros((n, 2), dtype=bool)
+        self.facing = np.zeros((n, 2))  # -1 left, 1 right
+        self.boost_left = np.zeros((n, 2))
+        self.jumps_remaining = np.zeros((n, 2), dtype=np.int8)
+        self.score = np.zeros((n, 2), dtype=np.int32)
+        self.touches = np.zeros((n, 2), dtype=np.int32)
+
+        # match
+        # the frame each pair can hit again from, like Match's cooldowns: ball and fennec, ball and octane, the cars
+        self.cooldowns = np.zeros((n, 3), dtype=np.int64)
+        self.status = np.full(n, PREGAME, dtype=np.int8)
+        self.frame = np.zeros(n, dtype=np.int64)
+        self.winner = np.full(n, -1, dtype=np.int8)  # -1 nobody yet, 0 blue, 1 orange
+
+        self.reset()
+
+    def reset(self, mask=None):
+        # restarts every match, or only the ones where mask is True
+        if mask is None:
+            mask = np.ones(self.n, dtype=bool)
+        self.reset_objects(mask)
+        self.facing[mask] = (1, -1)
+        self.boost_left[mask] = 100
+        self.score[mask] = 0
+        self.touches[mask] = 0
+        self.cooldowns[mask] = 0
+        self.status[mask] = MAIN_GAME
+        self.frame[mask] = 0
+        self.winner[mask] = -1
+
+    def reset_objects(self, mask):  # kickoff positions, like Ball.reset and Car.reset
+        self.reset_ball(mask)
+        self.reset_cars(mask[:, None] & np.ones((1, 2), dtype=bool))
+
+    def reset_ball(self, mask):
+        self.ball_x[mask] = self.ball_start[0]
+        self.ball_y[mask] = self.ball_start[1]
+        self.ball_vel_x[mask] = 0
+        self.ball_vel_y[mask] = 0
+        self.ball_force_y[mask] = self.ball_gravity
+        self.ball_grounded[mask] = False
+
+    def reset_cars(self, car_mask):  # car_mask has the same shape as the car arrays
+        self.car_x[car_mask] = np.broadcast_to(self.car_start_x, car_mask.shape)[car_mask]
+        self.car_y[car_mask] = np.broadcast_to(self.car_start_y, car_mask.shape)[car_mask]
+        self.car_vel_x[car_mask] = 0
+        self.car_vel_y[car_mask] = 0
+        self.drive_left[car_mask] = 0
+        self.drive_right[car_mask] = 0
+        self.boost_force[car_mask] = 0
+        self.friction_force[car_mask] = 0
+        self.car_force_y[car_mask] = self.car_gravity
+        self.car_grounded[car_mask] = False
+        self.jumps_remaining[car_mask] = 0
+
+    def time_left(self):
+        return self.total_time - self.frame / self.frame_rate
+
+    def is_playing(self):
+        return (self.status == MAIN_GAME) | (self.status == TIME_RAN_OUT) | (self.status == OVERTIME)
+
+    def ball_box(self):
+        r = self.radius
+        return self.ball_x - r, self.ball_y - r, 2 * r, 2 * r
+
+    def car_box(self, i):
+        return self.car_x[:, i], self.car_y[:, i], self.car_w, self.car_h
+
+    def step(self, inputs):
+        # inputs is an (n, 2) array of packed CarInput bits (engine.INPUT_*), one column per car
+        inputs = np.asarray(inputs)
+        r = self.radius
+        self.status[(self.status == MAIN_GAME) & (self.time_left() <= 0)] = TIME_RAN_OUT
+
+        # check if objects are grounded
+        self.ball_grounded = self.ball_y + r + self.ball_vel_y >= GROUND_TOP
+        self.car_grounded = self.car_y + self.car_h + self.car_vel_y >= GROUND_TOP
+
+        self.status[(self.status == TIME_RAN_OUT) & self.ball_grounded] = GAME_OVER
+
+        playing = self.is_playing()
+        self.apply_inputs(inputs, playing[:, None])
+
+        # collisions of objects
+        self.collide_cars()
+        self.collide_ball(1, 1)  # octane and ball
+        self.collide_ball(0, 0)  # ball and fennec
+
+        # collisions of objects into boundaries
+        self.bounce_off_boundaries()
+
+        # if someone scores
+        ended = np.zeros(self.n, dtype=bool)
+        orange_scored = self.ball_x + r < 0
+        blue_scored = self.ball_x - r > FIELD_W
+        ended |= self.score_goal(orange_scored, 1)
+        ended |= self.score_goal(blue_scored & ~ended, 0)
+
+        # cars that leave the field are put back
+        self.reset_cars((self.car_x + self.car_w < 0) | (self.car_x > FIELD_W))
+
+        self.integrate(playing & ~ended)
+        self.frame += 1
+
+        # a finished regulation either has a winner or goes to overtime
+        finished = (self.status == GAME_OVER) & (self.winner == -1)
+        if finished.any():
+            blue, orange = self.score[:, 0], self.score[:, 1]
+            self.winner[finished & (blue > orange)] = 0
+            self.winner[finished & (orange > blue)] = 1
+            tied = finished & (blue == orange)
+            self.status[tied] = OVERTIME
+            self.reset_objects(tied)
+
+    def apply_inputs(self, inputs, playing):
+        # apply_car_input for every car of every match that is being played
+        left = ((inputs & INPUT_LEFT) != 0) & playing
+        right = ((inputs & INPUT_RIGHT) != 0) & playing
+        boost = ((inputs & INPUT_BOOST) != 0) & playing
+        up = ((inputs & INPUT_UP) != 0) & playing
+        jump = ((inputs & INPUT_JUMP) != 0) & playing
+        grounded = self.car_grounded
+        vel_x = self.car_vel_x
+
+        # x-axis
+        self.facing = np.where(left, -1.0, np.where(right, 1.0, self.facing))
+        can_drive_left = left & (vel_x > -self.thrust_speed_limit) & (self.car_x > 0)
+        can_drive_right = right & (vel_x < self.thrust_speed_limit) & (self.car_x + self.car_w < FIELD_W)
+        keep = playing & ~can_drive_left  # cars not being played keep their forces
+        self.drive_left = np.where(can_drive_left & grounded, -self.thrust, np.where(keep, 0, self.drive_left))
+        keep = playing & ~can_drive_right
+        self.drive_right = np.where(can_drive_right & grounded, self.thrust, np.where(keep, 0, self.drive_right))
+
+        # boost
+        hover = up & (self.boost_left > 0) & (self.jumps_remaining <= 0)
+        self.car_vel_y -= np.where(hover & (self.car_vel_y > -15), 1.5, 0)
+        self.boost_left -= np.where(hover, 2, 0)
+        for direction, limit_ok in ((-1, vel_x > -self.boost_speed_limit), (1, vel_x < self.boost_speed_limit)):
+            boosting = boost & (self.boost_left > 0) & (self.facing == direction) & limit_ok
+            starting = boosting & (self.boost_force != direction * self.boost_thrust)
+            if direction == -1:
+                self.drive_left = np.where(starting & grounded, -self.thrust, self.drive_left)
+            else:
+                self.drive_right = np.where(starting & grounded, self.thrust, self.drive_right)
+            stopping = playing & ~boosting & (self.boost_force == direction * self.boost_thrust)
+            self.boost_force = np.where(boosting, direction * self.boost_thrust, np.where(stopping, 0, self.boost_force))
+            self.boost_left -= np.where(boosting, 2, 0)
+
+        # friction
+        moving = np.where(vel_x < 0, self.car_friction, np.where(vel_x > 0, -self.car_friction, self.friction_force))
+        still = grounded & (np.abs(vel_x) <= 0.31)
+        friction = np.where(grounded, moving, 0)
+        friction[still] = 0
+        self.friction_force = np.where(playing, friction, self.friction_force)
+        self.car_vel_x = np.where(playing & still, 0, vel_x)
+
+        self.boost_left = np.where(playing, np.minimum(self.boost_left + self.boost_regen_rate, 100), self.boost_left)
+
+        # y-axis
+        self.jumps_remaining[playing & grounded] = 2
+        has_jump = jump & (self.jumps_remaining > 0)
+        flip = has_jump & (self.jumps_remaining == 1) & (left | right)
+        jump_up = has_jump & ~flip
+        self.car_vel_y -= np.where(jump_up, np.where(self.jumps_remaining == 2, 15, 10), 0)
+        self.car_vel_y = np.where(flip, (self.car_vel_y - 2) * 0.7, self.car_vel_y)
+        self.car_vel_x += np.where(flip, np.where(left, -8, 8), 0)
+        self.jumps_remaining -= has_jump.astype(np.int8)
+
+    def collide_cars(self):
+        touching = boxes_touching(*self.car_box(0), *self.car_box(1)) & (self.frame >= self.cooldowns[:, 2])
+        if not touching.any():
+            return
+        m = self.car_mass
+        e = 1.0 if self.elastic_collisions else self.car_elasticity
+        self.car_vel_x[:, 0], self.car_vel_x[:, 1] = collision_velocities_arrays(
+            self.car_vel_x[:, 0], self.car_vel_x[:, 1], m, m, e, touching)
+        self.car_vel_y[:, 0], self.car_vel_y[:, 1] = collision_velocities_arrays(
+            self.car_vel_y[:, 0], self.car_vel_y[:, 1], m, m, e, touching)
+        # fix vertical collisions
+        x, y, w, h = self.car_x, self.car_y, self.car_w, self.car_h
+        for top, bottom in ((0, 1), (1, 0)):
+            landed = touching & self.car_grounded[:, bottom] & boxes_touching(
+                x[:, top], y[:, top] + h - 5, w, 5, x[:, bottom], y[:, bottom], w, 5)
+            self.car_vel_y[:, top] -= np.where(landed, 1.5, 0)
+        self.cooldowns[touching, 2] = self.frame[touching] + self.cooldown_length
+
+    def collide_ball(self, i, cooldown):
+        touching = boxes_touching(*self.ball_box(), *self.car_box(i)) & (self.frame >= self.cooldowns[:, cooldown])
+        if not touching.any():
+            return
+        e = 1.0 if self.elastic_collisions else max(self.ball_elasticity, self.car_elasticity)
+        self.ball_vel_x, self.car_vel_x[:, i] = collision_velocities_arrays(
+            self.ball_vel_x, self.car_vel_x[:, i], self.ball_mass, self.car_mass, e, touching)
+        self.ball_vel_y, self.car_vel_y[:, i] = collision_velocities_arrays(
+            self.ball_vel_y, self.car_vel_y[:, i], self.ball_mass, self.car_mass, e, touching)
+        # fix vertical collisions
+        r = self.radius
+        bx, by = self.ball_x - r, self.ball_y - r
+        cx, cy, w, h = self.car_x[:, i], self.car_y[:, i], self.car_w, self.car_h
+        car_on_ball = touching & self.ball_grounded & boxes_touching(cx, cy + h - 5, w, 5, bx, by, 2 * r, 5)
+        ball_on_car = touching & self.car_grounded[:, i] & boxes_touching(bx, by + 2 * r - 5, 2 * r, 5, cx, cy, w, 5)
+        self.car_vel_y[:, i] -= np.where(car_on_ball, 1.5, 0)
+        self.ball_vel_y -= np.where(ball_on_car, 1.5, 0)
+        self.cooldowns[touching, cooldown] = self.frame[touching] + self.cooldown_length
+        self.touches[touching, i] += 1
+
+    def bounce_off_boundaries(self):
+        # ball
+        left, top, w, h = self.ball_box()
+        under_wall = hit_bottom_of_wall(left, top, w, self.ball_vel_y)
+        on_wall = (boxes_touching(left, top, w, h, 0, 0, WALL_W, WALL_BOTTOM) |
+                   boxes_touching(left, top, w, h, RIGHT_WALL_LEFT, 0, WALL_W, WALL_BOTTOM))
+        self.ball_vel_x = np.where(on_wall & ~under_wall, -self.ball_vel_x, self.ball_vel_x)
+        on_ceiling = boxes_touching(left, top, w, h, 0, 0, FIELD_W, CEILING_BOTTOM)
+        self.ball_vel_y = np.where(under_wall | on_ceiling, -self.ball_vel_y, self.ball_vel_y)
+
+        # cars
+        left, top, w, h = self.car_x, self.car_y, self.car_w, self.car_h
+        on_wall = (boxes_touching(left, top, w, h, 0, 0, WALL_W, WALL_BOTTOM) |
+                   boxes_touching(left, top, w, h, RIGHT_WALL_LEFT, 0, WALL_W, WALL_BOTTOM))
+        self.car_vel_x = np.where(on_wall, -self.car_vel_x, self.car_vel_x)
+        under_wall = hit_bottom_of_wall(left, top, w, self.car_vel_y)
+        on_ceiling = boxes_touching(left, top, w, h, 0, 0, FIELD_W, CEILING_BOTTOM)
+        self.car_vel_y = np.where(under_wall | on_ceiling, -self.car_vel_y, self.car_vel_y)
+        outside = (left < 0) | (left + w > FIELD_W)
+        self.car_vel_x = np.where(outside, -self.car_vel_x, self.car_vel_x)
+
+    def score_goal(self, scored, scorer):
+        # returns the matches this goal ended
+        if not scored.any():
+            return scored
+        conceder = 1 - scorer
+        self.score[scored, scorer] += 1
+        self.boost_left[scored, scorer] = np.minimum(100, self.boost_left[scored, scorer] + 25)
+        self.boost_left[scored, conceder] = np.minimum(100, self.boost_left[scored, conceder] + 50)
+        in_regulation = scored & ((self.status == MAIN_GAME) | (self.status == TIME_RAN_OUT))
+        self.reset_objects(in_regulation)
+        sudden_death = scored & (self.status == OVERTIME)
+        self.status[sudden_death] = GAME_OVER
+        self.winner[sudden_death] = scorer
+        return sudden_death
+
+    def integrate(self, moving):
+        # take_gravity, then accelerate and move every object of the matches being played
+        falling = self.ball_y + self.radius + self.ball_vel_y < GROUND_TOP
+        bounce = self.ball_vel_y * -self.ball_elasticity
+        bounce[np.abs(bounce) <= 0.31] = 0
+        self.ball_vel_y = np.where(falling | ~moving, self.ball_vel_y, bounce)
+        self.ball_force_y = np.where(moving, np.where(falling, self.ball_gravity, 0), self.ball_force_y)
+
+        car_moving = moving[:, None]
+        falling = self.car_y + self.car_h + self.car_vel_y < GROUND_TOP
+        bounce = self.car_vel_y * -self.car_elasticity
+        bounce[np.abs(bounce) <= 0.31] = 0
+        self.car_vel_y = np.where(falling | ~car_moving, self.car_vel_y, bounce)
+        self.car_force_y = np.where(car_moving, np.where(falling, self.car_gravity, 0), self.car_force_y)
+
+        self.ball_vel_y += np.where(moving, self.ball_force_y / self.ball_mass, 0)
+        self.ball_x += np.where(moving, self.ball_vel_x, 0)
+        self.ball_y += np.where(moving, self.ball_vel_y, 0)
+
+        accel_x = (self.drive_left + self.drive_right + self.boost_force + self.friction_force) / self.car_mass
+        self.car_vel_x += np.where(car_moving, accel_x, 0)
+        self.car_vel_y += np.where(car_moving, self.car_force_y / self.car_mass, 0)
+        self.car_x += np.where(car_moving, self.car_vel_x, 0)
+        self.car_y += np.where(car_moving, self.car_vel_y, 0)
+
+    def run(self, policy=None, max_frames=None):
+        # policy(arena) returns an (n, 2) array of input bits, steps until every match has a winner
+        self.reset()
+        no_input = np.zeros((self.n, 2), dtype=np.int32)
+        frames = 0
+        while (self.winner == -1).any():
+            if max_frames is not None and frames >= max_frames:
+                break
+            self.step(no_input if policy is None else policy(self))
+            frames += 1
+        return self.winner
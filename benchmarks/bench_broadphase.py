@@ -0,0 +1,64 @@
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from broadphase import SweepAndPrune
+from engine import objects_are_touching
+
+
+class Box(object):
+    def __init__(self, rng):
+        self.x = rng.uniform(0, 1440)
+        self.y = rng.uniform(0, 680)
+        self.vel_x = rng.uniform(-20, 20)
+        self.vel_y = rng.uniform(-20, 20)
+        self.hitbox = (self.x, self.y, 60, 60)
+
+    def move(self):  # bounces around the arena like the ball does
+        if not 0 < self.x + self.vel_x < 1440:
+            self.vel_x = -self.vel_x
+        if not 0 < self.y + self.vel_y < 680:
+            self.vel_y = -self.vel_y
+        self.x += self.vel_x
+        self.y += self.vel_y
+        self.hitbox = (self.x, self.y, 60, 60)
+
+
+def all_pairs(boxes):  # what checking every pair costs
+    touching = []
+    for i in range(len(boxes)):
+        for j in range(i + 1, len(boxes)):
+            if objects_are_touching(boxes[i], boxes[j]):
+                touching.append((boxes[i], boxes[j]))
+    return touching
+
+
+def sweep_and_prune(broad_phase):
+    broad_phase.update()
+    return [pair for pair in broad_phase.pairs()[0] if objects_are_touching(*pair)]
+
+
+def per_tick_us(count, ticks=200):
+    rng = random.Random(count)
+    boxes = [Box(rng) for i in range(count)]
+    broad_phase = SweepAndPrune()
+    for box in boxes:
+        broad_phase.add_object(box)
+
+    def tick(find_pairs):
+        for box in boxes:
+            box.move()
+        find_pairs()
+
+    brute = min(timeit.repeat(lambda: tick(lambda: all_pairs(boxes)), number=ticks, repeat=3)) / ticks
+    swept = min(timeit.repeat(lambda: tick(lambda: sweep_and_prune(broad_phase)), number=ticks, repeat=3)) / ticks
+    return brute * 1e6, swept * 1e6
+
+
+if __name__ == '__main__':
+    print('objects   every pair   sweep and prune   (us per tick, moving included)')
+    for count in (3, 8, 16, 32, 64, 128):
+        brute, swept = per_tick_us(count)
+        print(f'{count:7d}   {brute:10.1f}   {swept:15.1f}')
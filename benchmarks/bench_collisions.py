@@ -0,0 +1,49 @@
+import os
+import sys
+import timeit
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from collisions import collision_set_new_velocities, collision_velocities_arrays
+from engine import make_ball, make_fennec
+
+
+def linalg_set_new_velocities(obj1, obj2):  # how collisions were solved before collisions.py
+    m1 = obj1.mass
+    m2 = obj2.mass
+    n_mat = np.array([[m1, m2], [1, -1]])
+    constants = np.array([(m1 * obj1.vel_x + m2 * obj2.vel_x), (obj2.vel_x - obj1.vel_x)])
+    final_velocities_x = np.linalg.solve(n_mat, constants)
+    n_mat = np.array([[m1, m2], [1, -1]])
+    constants = np.array([(m1 * obj1.vel_y + m2 * obj2.vel_y), (obj2.vel_y - obj1.vel_y)])
+    final_velocities_y = np.linalg.solve(n_mat, constants)
+    obj1.vel_x = final_velocities_x[0]
+    obj2.vel_x = final_velocities_x[1]
+    obj1.vel_y = final_velocities_y[0]
+    obj2.vel_y = final_velocities_y[1]
+
+
+def per_contact_us(function, number=20000):
+    ball = make_ball()
+    car = make_fennec()
+    ball.vel_x, ball.vel_y, car.vel_x, car.vel_y = 4.0, -3.0, -12.0, 1.5
+    seconds = min(timeit.repeat(lambda: function(ball, car), number=number, repeat=5))
+    return seconds / number * 1e6
+
+
+def batched_per_contact_us(pairs=100000):
+    rng = np.random.default_rng(0)
+    v1 = rng.uniform(-25, 25, pairs)
+    v2 = rng.uniform(-25, 25, pairs)
+    touching = rng.random(pairs) < 0.5
+    seconds = min(timeit.repeat(lambda: collision_velocities_arrays(v1, v2, 1, 3, touching=touching),
+                                number=20, repeat=5)) / 20
+    return seconds * 2 / pairs * 1e6  # both axes
+
+
+if __name__ == '__main__':
+    before = per_contact_us(linalg_set_new_velocities)
+    after = per_contact_us(collision_set_new_velocities)
+    print(f'np.linalg.solve:      {before:8.3f} us per contact')
+    print(f'closed form:          {after:8.3f} us per contact ({before / after:.0f}x faster)')
+    print(f'closed form, batched: {batched_per_contact_us():8.3f} us per contact')
@@ -0,0 +1,251 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import timeit
+
+# everything runs without a screen or sound card
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+from bots import make_bot
+from collisions import collision_set_new_velocities
+from engine import *
+from snapshot import SnapshotRing
+
+
+# runs every benchmark and compares it with baselines.json, exits with 1 if anything got slower than the threshold
+#   python benchmarks/suite.py                  compare with the baselines
+#   python benchmarks/suite.py --update         save these numbers as the new baselines
+#   python benchmarks/suite.py physics text     only run benchmarks whose names start with these
+# baselines are only comparable on the machine they were saved on, save them again after changing machines
+BASELINES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines.json')
+
+
+def physics_ticks_per_second(ticks=20000):  # two chasing bots, so there are touches, goals and kickoffs
+    match = HeadlessMatch(total_time=10 ** 6, frame_rate=PHYSICS_BASE_RATE * 4)
+    blue = make_bot('chase', 0)
+    orange = make_bot('chase', 1)
+    match.reset()
+    start = time.perf_counter()
+    for tick in range(ticks):
+        match.step(blue.act(match, 0), orange.act(match, 1))
+    return ticks / (time.perf_counter() - start)
+
+
+def collision_set_new_velocities_us(number=20000):
+    ball = make_ball()
+    car = make_fennec()
+    ball.vel_x, ball.vel_y, car.vel_x, car.vel_y = 4.0, -3.0, -12.0, 1.5
+    seconds = min(timeit.repeat(lambda: collision_set_new_velocities(ball, car), number=number, repeat=7))
+    return seconds / number * 1e6
+
+
+def objects_are_touching_us(number=50000):
+    ball = make_ball()
+    car = make_fennec()
+    seconds = min(timeit.repeat(lambda: objects_are_touching(ball, car), number=number, repeat=7))
+    return seconds / number * 1e6
+
+
+def playing_match():  # a match some way into play, so nothing in its snapshot is a default
+    match = HeadlessMatch(total_time=45, frame_rate=PHYSICS_BASE_RATE)
+    blue = make_bot('chase', 0)
+    orange = make_bot('chase', 1)
+    match.reset()
+    for tick in range(500):
+        match.step(blue.act(match, 0), orange.act(match, 1))
+    return match
+
+
+def snapshot_save_us(number=20000):
+    match = playing_match()
+    ring = SnapshotRing(64)
+    seconds = min(timeit.repeat(lambda: ring.save(match), number=number, repeat=7))
+    return seconds / number * 1e6
+
+
+def snapshot_restore_us(number=20000):
+    match = playing_match()
+    ring = SnapshotRing(64)
+    ring.save(match)
+    tick = match.ticks
+    seconds = min(timeit.repeat(lambda: ring.restore(match, tick), number=number, repeat=7))
+    return seconds / number * 1e6
+
+
+def make_game(size=(1440, 800)):
+    # a real Game past its countdown, without the start screen, the countdown or the match loop
+    # other sizes than 1440x800 draw everything scaled
+    import pygame
+    from compositor import create_window
+    import Game
+
+    def start_screen(self):
+        self.name_fennec = 'Blue'
+        self.name_octane = 'Orange'
+
+    window = create_window(size)
+    images = {name: pygame.image.load(os.path.join(ROOT, 'images', name + '.png')).convert_alpha()
+              for name in ('ball', 'fennec_left', 'fennec_right', 'fennec_boost_left', 'fennec_boost_right',
+                           'fennec_hover', 'octane_left', 'octane_right', 'octane_boost_left',
+                           'octane_boost_right', 'octane_hover')}
+    ball = make_ball(images['ball'])
+    fennec = make_fennec([images['fennec_' + name] for name in ('left', 'right', 'boost_left', 'boost_right',
+                                                                 'hover')])
+    octane = make_octane([images['octane_' + name] for name in ('left', 'right', 'boost_left', 'boost_right',
+                                                                 'hover')])
+    patched = (Game.Game.start_screen, Game.Game.beginning_countdown, Game.Game.main)
+    Game.Game.start_screen = start_screen
+    Game.Game.beginning_countdown = Game.Game.make_renderer
+    Game.Game.main = lambda self: None
+    cwd = os.getcwd()
+    os.chdir(ROOT)  # the game loads its images and sounds from relative paths
+    try:
+        game = Game.Game(window, ball, fennec, octane, total_time=45, frame_rate=60)
+    finally:
+        os.chdir(cwd)
+        Game.Game.start_screen, Game.Game.beginning_countdown, Game.Game.main = patched
+    game.status = game.MAIN_GAME
+    return game
+
+
+def redraw_game_window_ms(frames=600, size=(1440, 800)):
+    game = make_game(size)
+    blue = make_bot('chase', 0)
+    orange = make_bot('chase', 1)
+    seconds = 0.0
+    for frame in range(frames):  # things move between frames so the dirty rectangles are realistic
+        for obj in game.game_objects:
+            obj.save_position()
+        step(game, (blue.act(game, 0), orange.act(game, 1)))
+        game.interpolate_objects(1)
+        start = time.perf_counter()
+        game.redraw_game_window()
+        seconds += time.perf_counter() - start
+    return seconds / frames * 1000
+
+
+def text_render_us(number=20000):  # the clock's text, the same every frame so the cache is hit
+    from text import get_font, render_text
+    font = get_font('sfprotextthin', 50, True)
+    render_text(font, '0:45', (255, 255, 255))
+    seconds = min(timeit.repeat(lambda: render_text(font, '0:45', (255, 255, 255)), number=number, repeat=7))
+    return seconds / number * 1e6
+
+
+def text_render_uncached_us(number=5000):  # font.render every time, what a cache miss costs
+    from text import get_font
+    font = get_font('sfprotextthin', 50, True)
+    seconds = min(timeit.repeat(lambda: font.render('0:45', True, (255, 255, 255)), number=number, repeat=7))
+    return seconds / number * 1e6
+
+
+COLD_START = '''
+import os, runpy, sys
+sys.path.insert(0, '.')
+import pygame
+update = pygame.display.update
+def first_frame(*args):  # the start screen's first frame is on the screen, nothing else is left to time
+    update(*args)
+    os._exit(0)
+pygame.display.update = first_frame
+runpy.run_path('main.py', run_name='__main__')
+sys.exit('main.py ended without showing the start screen')
+'''
+
+
+def main_cold_start_ms(runs=3):  # a new python running the real main.py until the start screen's first frame is shown
+    best = None
+    for run in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', COLD_START], cwd=ROOT, check=True, stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL)
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return best * 1000
+
+
+# name: (function, unit, higher is better)
+BENCHMARKS = {
+    'physics ticks per second': (physics_ticks_per_second, 'ticks/s', True),
+    'collision_set_new_velocities': (collision_set_new_velocities_us, 'us', False),
+    'objects_are_touching': (objects_are_touching_us, 'us', False),
+    'snapshot save': (snapshot_save_us, 'us', False),
+    'snapshot restore': (snapshot_restore_us, 'us', False),
+    'redraw_game_window': (redraw_game_window_ms, 'ms', False),
+    'redraw at 960x533': (lambda: redraw_game_window_ms(size=(960, 533)), 'ms', False),
+    'redraw at 1920x1080': (lambda: redraw_game_window_ms(size=(1920, 1080)), 'ms', False),
+    'text render cached': (text_render_us, 'us', False),
+    'text render uncached': (text_render_uncached_us, 'us', False),
+    'main.py cold start': (main_cold_start_ms, 'ms', False),
+}
+
+
+def best(value, other, higher_is_better):
+    return max(value, other) if higher_is_better else min(value, other)
+
+
+def regression(value, baseline, higher_is_better):  # how much worse value is, 0.1 is 10% worse
+    if higher_is_better:
+        return baseline / value - 1
+    return value / baseline - 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run the benchmarks and compare them with the saved baselines.')
+    parser.add_argument('names', nargs='*', help='only run benchmarks whose names start with these')
+    parser.add_argument('--update', action='store_true', help='save the results as the new baselines')
+    parser.add_argument('--threshold', type=float, default=0.25, help='how much worse counts as a regression')
+    parser.add_argument('--retries', type=int, default=2,
+                        help='extra runs before calling something a regression, and for the baselines')
+    parser.add_argument('--baselines', default=BASELINES)
+    args = parser.parse_args(argv)
+
+    baselines = {}
+    if os.path.exists(args.baselines):
+        with open(args.baselines) as file:
+            baselines = json.load(file)
+
+    regressions = []
+    for name, (function, unit, higher_is_better) in BENCHMARKS.items():
+        if args.names and not any(name.startswith(prefix) for prefix in args.names):
+            continue
+        value = function()
+        if args.update:
+            for retry in range(args.retries):  # the baseline is the best this machine manages
+                value = best(value, function(), higher_is_better)
+        baseline = baselines.get(name)
+        if baseline is not None and not args.update:
+            worse = regression(value, baseline['value'], higher_is_better)
+            for retry in range(args.retries):  # a busy machine makes one run slow, a real regression stays slow
+                if worse <= args.threshold:
+                    break
+                value = best(value, function(), higher_is_better)
+                worse = regression(value, baseline['value'], higher_is_better)
+        line = f'{name:<30} {value:12.3f} {unit:<8}'
+        if baseline is not None and not args.update:
+            line += f' baseline {baseline["value"]:12.3f} {-worse:+8.1%}'
+            if worse > args.threshold:
+                line += '  REGRESSION'
+                regressions.append(name)
+        print(line, flush=True)
+        if args.update:
+            baselines[name] = {'value': value, 'unit': unit, 'higher is better': higher_is_better}
+
+    if args.update:
+        with open(args.baselines, 'w') as file:
+            json.dump(baselines, file, indent=2)
+        print(f'saved {args.baselines}')
+        return 0
+    if regressions:
+        print(f'{len(regressions)} regressed more than {args.threshold:.0%}: {", ".join(regressions)}')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
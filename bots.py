@@ -0,0 +1,71 @@
+from engine import *
+import random
+
+
+# scripted controllers, a bot is made once per match with its own random generator
+# act(match, car_index) returns the CarInput for match.cars[car_index] this tick, 0 is fennec (blue), 1 is octane
+
+
+class IdleBot(object):  # never touches the controls
+    def __init__(self, rng):
+        self.rng = rng
+
+    def act(self, match, car_index):
+        return NO_INPUT
+
+
+class RandomBot(object):  # mashes random buttons, holding each combination for a random time
+    def __init__(self, rng):
+        self.rng = rng
+        self.bits = 0
+        self.hold = 0  # ticks left before choosing again
+
+    def act(self, match, car_index):
+        if self.hold <= 0:
+            self.bits = self.rng.randrange(32)
+            self.hold = self.rng.randrange(1, match.physics_rate)
+        self.hold -= 1
+        return CarInput.from_bits(self.bits)
+
+
+class ChaseBot(object):  # drives behind the ball and hits it toward the other goal, jumping for high balls
+    def __init__(self, rng):
+        self.rng = rng
+        self.jumped_last_tick = False
+
+    def act(self, match, car_index):
+        car = match.cars[car_index]
+        ball = match.ball
+        attack = 1 if car_index == 0 else -1  # blue scores on the right, orange on the left
+        car_center = car.x + car.w / 2
+        target = ball.x - attack * (ball.radius + car.w / 2)  # just behind the ball
+        left = car_center > target + 10
+        right = car_center < target - 10
+        far = abs(car_center - target) > 400
+        ball_above = abs(ball.x - car_center) < 80 and ball.y < car.y - 40
+        jump = ball_above and car.is_grounded and not self.jumped_last_tick
+        self.jumped_last_tick = jump
+        return CarInput(left=left, right=right, boost=far, up=ball_above, jump=jump)
+
+
+class GoalieBot(object):  # stays between the ball and its own goal, only chases when the ball comes close
+    def __init__(self, rng):
+        self.rng = rng
+        self.chaser = ChaseBot(rng)
+
+    def act(self, match, car_index):
+        car = match.cars[car_index]
+        ball = match.ball
+        own_goal = 150 if car_index == 0 else 1290
+        if abs(ball.x - own_goal) < 450:
+            return self.chaser.act(match, car_index)
+        car_center = car.x + car.w / 2
+        guard = (own_goal + ball.x) / 2  # halfway between the goal and the ball
+        return CarInput(left=car_center > guard + 20, right=car_center < guard - 20)
+
+
+BOTS = {'idle': IdleBot, 'random': RandomBot, 'chase': ChaseBot, 'goalie': GoalieBot}
+
+
+def make_bot(name, seed=None):
+    return BOTS[name](random.Random(seed))
@@ -0,0 +1,60 @@
+INFINITY = float('inf')
+
+
+class SweepAndPrune(object):
+    # finds which boxes might overlap without checking every pair: boxes are kept sorted by their left edge,
+    # so only boxes whose x ranges overlap are ever compared. Objects barely move between ticks, so the order
+    # hardly changes and re-sorting it with an insertion sort is close to linear
+    # pairs are candidates only, edges that just touch count too, the exact check is left to the caller
+    def __init__(self):
+        self.entries = []  # [left, top, right, bottom, item, is_static], sorted by left after update
+
+    def add_object(self, obj):  # something that moves, its box is read from obj.hitbox every update
+        self.entries.append([0, 0, 0, 0, obj, False])
+
+    def add_static(self, structure, left, top, right, bottom):
+        # something that never moves, the box can reach past the structure (even to infinity) to cover
+        # everything the exact check could ever say yes to
+        self.entries.append([left, top, right, bottom, structure, True])
+
+    def update(self, dt=0):
+        # reads where every object is now and sorts again, with dt each box also covers where the object's
+        # velocity takes it over the next dt, for finding what it could run into on the way
+        entries = self.entries
+        for entry in entries:
+            if not entry[5]:
+                obj = entry[4]
+                hitbox = obj.hitbox
+                move_x = obj.vel_x * dt
+                move_y = obj.vel_y * dt
+                entry[0] = hitbox[0] + min(move_x, 0)
+                entry[1] = hitbox[1] + min(move_y, 0)
+                entry[2] = hitbox[0] + hitbox[2] + max(move_x, 0)
+                entry[3] = hitbox[1] + hitbox[3] + max(move_y, 0)
+        for i in range(1, len(entries)):  # insertion sort, almost sorted already
+            entry = entries[i]
+            j = i - 1
+            while j >= 0 and entries[j][0] > entry[0]:
+                entries[j + 1] = entries[j]
+                j -= 1
+            entries[j + 1] = entry
+
+    def pairs(self):
+        # returns (object pairs, (object, structure) pairs) whose boxes overlap, structures never pair with each other
+        object_pairs = []
+        static_pairs = []
+        active = []  # entries whose x range reaches the left edge being swept
+        for entry in self.entries:
+            left = entry[0]
+            active = [other for other in active if other[2] >= left]
+            for other in active:
+                if other[1] <= entry[3] and entry[1] <= other[3]:  # y ranges overlap too
+                    if entry[5]:
+                        if not other[5]:
+                            static_pairs.append((other[4], entry[4]))
+                    elif other[5]:
+                        static_pairs.append((entry[4], other[4]))
+                    else:
+                        object_pairs.append((other[4], entry[4]))
+            active.append(entry)
+        return object_pairs, static_pairs
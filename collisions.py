@@ -0,0 +1,76 @@
+import numpy as np
+
+
+# closed form of the 1D collision, solving
+#   m1vf1 + m2vf2 = m1v01 + m2v02        (conservation of momentum)
+#   vf1 - vf2 = e * (v02 - v01)          (restitution, e = 1 conserves kinetic energy)
+# for vf1 and vf2, done separately for x and y
+
+
+def restitution_between(obj1, obj2):
+    # how bouncy a hit between two objects is, the bouncier object decides (ball 0.8, car 0.1)
+    return max(obj1.elasticity, obj2.elasticity)
+
+
+def collision_velocities(v1, v2, m1, m2, restitution=1.0):
+    momentum = m1 * v1 + m2 * v2
+    total_mass = m1 + m2
+    return ((momentum + m2 * restitution * (v2 - v1)) / total_mass,
+            (momentum + m1 * restitution * (v1 - v2)) / total_mass)
+
+
+def collision_set_new_velocities(obj1, obj2, restitution=1.0):
+    m1 = obj1.mass  # mass of object 1
+    m2 = obj2.mass  # mass of object 2
+    total_mass = m1 + m2
+
+    # x direction
+    momentum = m1 * obj1.vel_x + m2 * obj2.vel_x
+    difference = obj2.vel_x - obj1.vel_x
+    obj1.vel_x = (momentum + m2 * restitution * difference) / total_mass
+    obj2.vel_x = (momentum - m1 * restitution * difference) / total_mass
+
+    # y direction
+    momentum = m1 * obj1.vel_y + m2 * obj2.vel_y
+    difference = obj2.vel_y - obj1.vel_y
+    obj1.vel_y = (momentum + m2 * restitution * difference) / total_mass
+    obj2.vel_y = (momentum - m1 * restitution * difference) / total_mass
+
+
+def collision_velocities_arrays(v1, v2, m1, m2, restitution=1.0, touching=None):
+    # collision_velocities for arrays of pairs, every argument can be an array or a number
+    # pairs where touching is False keep their velocities
+    v1 = np.asarray(v1, dtype=np.float64)
+    v2 = np.asarray(v2, dtype=np.float64)
+    new_v1, new_v2 = collision_velocities(v1, v2, m1, m2, restitution)
+    if touching is None:
+        return new_v1, new_v2
+    return np.where(touching, new_v1, v1), np.where(touching, new_v2, v2)
+
+
+def time_of_impact(box1, box2, dx, dy):
+    # box1 moves by (dx, dy) relative to box2 during a tick, boxes are (left, top, width, height)
+    # returns (t, axis) of the first contact, t from 0 (start of the tick) to 1 (end), axis 'x' if it hit a side,
+    # or None if they don't meet this tick or already overlap (which the overlap checks handle)
+    entry = [0.0, 0.0]
+    leave = [0.0, 0.0]
+    for axis, d in ((0, dx), (1, dy)):
+        start1 = box1[axis]
+        end1 = box1[axis] + box1[axis + 2]
+        start2 = box2[axis]
+        end2 = box2[axis] + box2[axis + 2]
+        if d > 0:
+            entry[axis] = (start2 - end1) / d
+            leave[axis] = (end2 - start1) / d
+        elif d < 0:
+            entry[axis] = (end2 - start1) / d
+            leave[axis] = (start2 - end1) / d
+        elif end1 > start2 and start1 < end2:  # not moving on this axis, but already lined up on it
+            entry[axis] = float('-inf')
+            leave[axis] = float('inf')
+        else:
+            return None
+    t = max(entry)
+    if t < 0 or t > 1 or t >= min(leave):  # already overlapping, too far away, or only brushes an edge
+        return None
+    return t, 'x' if entry[0] > entry[1] else 'y'
@@ -0,0 +1,39 @@
+import pygame
+
+
+def create_window(size, vsync=False, scaled=False, fullscreen=False):
+    # vsync only works on a SCALED (or OpenGL) window, so asking for vsync also scales
+    # a SCALED window's surface stays size, the graphics card stretches it to however big the window really is
+    flags = pygame.SCALED if scaled or vsync else 0
+    if fullscreen:
+        flags |= pygame.FULLSCREEN
+    try:
+        return pygame.display.set_mode(size, flags, vsync=1 if vsync else 0)
+    except pygame.error:  # no vsync on this driver, fall back to a normal window
+        return pygame.display.set_mode(size, flags)
+
+
+class FrameCompositor(object):
+    # every part of the picture registers a draw callback, compose draws all of them and present shows the frame once
+    # they are separate calls so the profiler can time drawing and presenting apart
+    def __init__(self, renderer):
+        self.renderer = renderer
+        self.layers = []  # [order, name, draw], drawn from lowest order to highest
+        self.presents = 0  # how many frames were shown
+
+    def add_layer(self, name, draw, order=0):  # draw(renderer) is called every frame
+        self.remove_layer(name)
+        self.layers.append([order, name, draw])
+        self.layers.sort(key=lambda layer: layer[0])
+
+    def remove_layer(self, name):
+        self.layers = [layer for layer in self.layers if layer[1] != name]
+
+    def compose(self):
+        self.renderer.begin_frame()
+        for order, name, draw in self.layers:
+            draw(self.renderer)
+
+    def present(self):
+        self.renderer.present()
+        self.presents += 1
@@ -0,0 +1,115 @@
+from bots import make_bot
+from engine import *
+import pygame
+
+
+# a controller drives one car: begin_frame sees every pygame event of a drawn frame once,
+# then act is called for every physics tick of that frame and returns the car's CarInput (chat included)
+# presses (jump, chat) wait in the controller until a tick uses them, so a frame with no ticks doesn't lose them
+
+FENNEC_KEYS = {'left': pygame.K_a, 'right': pygame.K_d, 'boost': pygame.K_s, 'up': pygame.K_w,
+               'chat': (pygame.K_f, pygame.K_t, pygame.K_g, pygame.K_h, pygame.K_e)}
+OCTANE_KEYS = {'left': pygame.K_LEFT, 'right': pygame.K_RIGHT, 'boost': pygame.K_DOWN, 'up': pygame.K_UP,
+               'chat': (pygame.K_j, pygame.K_i, pygame.K_k, pygame.K_l, pygame.K_SLASH)}
+
+
+class Controller(object):
+    def begin_frame(self, events):
+        pass
+
+    def act(self, match, car_index):
+        return NO_INPUT
+
+
+class KeyboardController(Controller):
+    def __init__(self, keys):
+        self.keys = keys  # like FENNEC_KEYS, pressing up also jumps
+        self.held = None  # pygame.key.get_pressed() of this frame
+        self.jump = False
+        self.chat = 0  # CHAT_BITS of released chat keys
+
+    def begin_frame(self, events):
+        chat_keys = self.keys['chat']
+        for event in events:
+            if event.type == pygame.KEYDOWN and event.key == self.keys['up']:
+                self.jump = True
+            elif event.type == pygame.KEYUP and event.key in chat_keys:
+                self.chat |= CHAT_BITS[chat_keys.index(event.key)]
+        self.held = pygame.key.get_pressed()  # register all keys pressed
+
+    def act(self, match, car_index):
+        held = self.held
+        keys = self.keys
+        car_input = CarInput(left=held[keys['left']], right=held[keys['right']], boost=held[keys['boost']],
+                             up=held[keys['up']], jump=self.jump, chat=self.chat)
+        self.jump = False  # a jump only happens on one tick
+        self.chat = 0
+        return car_input
+
+
+class JoystickController(Controller):
+    # stick or d-pad left and right drives, A jumps (held boosts up), X or B boosts, the hat and Y quick chat
+    def __init__(self, index=0, dead_zone=0.5, jump_button=0, boost_buttons=(1, 2), custom_chat_button=3):
+        if not pygame.joystick.get_init():
+            pygame.joystick.init()
+        self.joystick = pygame.joystick.Joystick(index)
+        self.instance_id = self.joystick.get_instance_id()
+        self.dead_zone = dead_zone
+        self.jump_button = jump_button
+        self.boost_buttons = boost_buttons
+        self.custom_chat_button = custom_chat_button
+        self.jump = False
+        self.chat = 0
+
+    def begin_frame(self, events):
+        for event in events:
+            if getattr(event, 'instance_id', None) != self.instance_id:
+                continue
+            if event.type == pygame.JOYBUTTONDOWN:
+                if event.button == self.jump_button:
+                    self.jump = True
+                elif event.button == self.custom_chat_button:
+                    self.chat |= CHAT_BITS[4]
+            elif event.type == pygame.JOYHATMOTION:  # left, up, down, right like the chat keys
+                for direction, bit in (((-1, 0), CHAT_BITS[0]), ((0, 1), CHAT_BITS[1]), ((0, -1), CHAT_BITS[2]),
+                                       ((1, 0), CHAT_BITS[3])):
+                    if event.value == direction:
+                        self.chat |= bit
+
+    def act(self, match, car_index):
+        joystick = self.joystick
+        stick = joystick.get_axis(0)
+        car_input = CarInput(left=stick < -self.dead_zone, right=stick > self.dead_zone,
+                             boost=any(joystick.get_button(button) for button in self.boost_buttons),
+                             up=bool(joystick.get_button(self.jump_button)), jump=self.jump, chat=self.chat)
+        self.jump = False
+        self.chat = 0
+        return car_input
+
+
+class BotController(Controller):  # one of the scripted bots from bots.py
+    def __init__(self, name, seed=None):
+        self.bot = make_bot(name, seed)
+
+    def act(self, match, car_index):
+        return self.bot.act(match, car_index)
+
+
+class ReplayController(Controller):  # plays back a car's recorded inputs, the match has to start where the replay does
+    def __init__(self, replay):
+        self.replay = replay
+
+    def act(self, match, car_index):
+        if match.ticks >= len(self.replay):
+            return NO_INPUT
+        return CarInput.from_bits(self.replay.tick_inputs(match.ticks)[car_index])
+
+
+def make_controller(kind, car_index, seed=None):
+    # kind is 'keyboard' (fennec keys for car 0, octane keys for car 1), 'joystick', 'joystick 1'... or a bot name
+    if kind == 'keyboard':
+        return KeyboardController(FENNEC_KEYS if car_index == 0 else OCTANE_KEYS)
+    if kind.startswith('joystick'):
+        number = kind[len('joystick'):].strip()
+        return JoystickController(int(number) if number else 0)
+    return BotController(kind, seed)
@@ -0,0 +1,589 @@
+from objects import *
+from collisions import *
+from broadphase import INFINITY, SweepAndPrune
+
+
+PHYSICS_BASE_RATE = 30  # ticks per second every per-tick constant (gravity, thrust, boost...) was tuned for
+TEAM_NAMES = ('blue', 'orange')  # team 0 defends the left goal, team 1 the right one
+MAX_SWEEP_HITS = 8  # hits continuous collisions resolve in one tick, the rest of the tick just moves
+
+# match status
+PREGAME = -1  # before game starts (countdown from 3)
+MAIN_GAME = 0  # if players are playing
+TIME_RAN_OUT = 1  # if time ran out but ball in air
+OVERTIME = 2  # if time ran out, ball hit ground, and score is tied
+GAME_OVER = 3  # if time ran out, ball hit ground, and player won
+
+
+def objects_are_touching(obj1, obj2):  # compares objects or hitboxes
+    box1 = obj1.hitbox
+    box2 = obj2.hitbox
+    left1 = box1[0]  # left of the first object
+    left2 = box2[0]  # left of the second object
+    top1 = box1[1]  # top of the first object
+    top2 = box2[1]  # top of the second object
+    right1 = box1[0] + box1[2]  # right of the first object
+    right2 = box2[0] + box2[2]  # right of the second object
+    bottom1 = box1[1] + box1[3]  # bottom of the first object
+    bottom2 = box2[1] + box2[3]  # bottom of the second object
+    collided = right1 > left2 and left1 < right2 and bottom1 > top2 and top1 < bottom2  # returns if they are touching
+    return collided
+
+
+def hitbox_are_touching(hitbox1, hitbox2):  # only used for following function
+    box1 = hitbox1
+    box2 = hitbox2
+    left1 = box1[0]  # left of the first object
+    left2 = box2[0]  # left of the second object
+    top1 = box1[1]  # top of the first object
+    top2 = box2[1]  # top of the second object
+    right1 = box1[0] + box1[2]  # right of the first object
+    right2 = box2[0] + box2[2]  # right of the second object
+    bottom1 = box1[1] + box1[3]  # bottom of the first object
+    bottom2 = box2[1] + box2[3]  # bottom of the second object
+    collided = right1 > left2 and left1 < right2 and bottom1 > top2 and top1 < bottom2  # returns if they are touching
+    return collided
+
+
+def objects_collided_vertically(top_obj, bottom_obj):
+    if hitbox_are_touching(top_obj.bottom_hitbox, bottom_obj.top_hitbox):  # if collided vertically
+        if bottom_obj.is_grounded:  # if bottom object is grounded, stop falling
+            top_obj.vel_y -= 1.5
+
+
+def take_friction(f_obj, dt=1):  # dt is how many 30 fps frames one physics tick lasts
+    if f_obj.is_grounded:  # obj is on ground
+        if f_obj.vel_x < 0:  # if object is moving to the left (negative), push right
+            # we want to add it, but only to the extent that it stops the car, not turn it around
+            f_obj.forces.friction = f_obj.friction
+        elif f_obj.vel_x > 0:  # if object is moving to the right (positive), push left
+            f_obj.forces.friction = f_obj.friction * -1
+        if abs(f_obj.vel_x) <= 0.31 * dt:  # if slow enough to be considered still, stop and remove friction
+            f_obj.forces.friction = 0.0
+            f_obj.vel_x = 0
+    else:  # if obj is falling, no friction
+        f_obj.forces.friction = 0.0
+
+
+def take_gravity(g_obj, ground_hitbox, dt=1):
+    if g_obj.is_falling(ground_hitbox, dt):
+        g_obj.is_grounded = False
+        g_obj.forces.gravity = g_obj.gravity  # if falling, add gravity
+    else:  # if touching ground, don't put gravity
+        g_obj.vel_y = g_obj.vel_y * -g_obj.elasticity  # bounce it back up
+        if abs(g_obj.vel_y) <= 0.31 * dt:
+            g_obj.vel_y = 0  # if almost still on ground, hold still
+        g_obj.forces.gravity = 0.0  # if grounded, don't use gravity
+
+
+def make_ball(image=None, rotation_steps=64):
+    return Ball(x=720, y=200, radius=30, mass=1, image=image,
+                gravity=1, friction=.35, elasticity=.8, rotation_steps=rotation_steps)
+
+
+def make_fennec(images=None):
+    return Car(x=200, y=645, w=86, h=35, mass=3, images=images,
+               gravity=1, friction=.35, elasticity=.1, thrust=1.5, facing='right')
+
+
+def make_octane(images=None):
+    return Car(x=1190, y=645, w=86, h=35, mass=3, images=images,
+               gravity=1, friction=.35, elasticity=.1, thrust=1.5, facing='left')
+
+
+# bits used when a CarInput is packed into a single number
+INPUT_LEFT = 1
+INPUT_RIGHT = 2
+INPUT_BOOST = 4
+INPUT_UP = 8
+INPUT_JUMP = 16
+CHAT_BITS = (32, 64, 128, 256, 512)  # quick chat keys: left, up, down, right, custom (f t g h e / j i k l slash)
+CHAT_MASK = 32 | 64 | 128 | 256 | 512
+
+
+class CarInput(object):
+    # what one car's controls are doing during a single tick, the same whether a person, a bot or a replay drives
+    def __init__(self, left=False, right=False, boost=False, up=False, jump=False, chat=0):
+        self.left = left  # driving left is held (a / left arrow)
+        self.right = right  # driving right is held (d / right arrow)
+        self.boost = boost  # boost is held (s / down arrow)
+        self.up = up  # jump key is held, boosts up once both jumps are used (w / up arrow)
+        self.jump = jump  # jump key was pressed this frame, with left or right held a second jump flips that way
+        self.chat = chat  # CHAT_BITS of the quick chat keys released this frame, the physics ignores them
+
+    def to_bits(self):
+        return ((INPUT_LEFT if self.left else 0) | (INPUT_RIGHT if self.right else 0) |
+                (INPUT_BOOST if self.boost else 0) | (INPUT_UP if self.up else 0) |
+                (INPUT_JUMP if self.jump else 0) | self.chat)
+
+    @staticmethod
+    def from_bits(bits):
+        return CarInput(left=bool(bits & INPUT_LEFT), right=bool(bits & INPUT_RIGHT), boost=bool(bits & INPUT_BOOST),
+                        up=bool(bits & INPUT_UP), jump=bool(bits & INPUT_JUMP), chat=bits & CHAT_MASK)
+
+
+NO_INPUT = CarInput()
+
+
+class ContactPair(object):
+    # two moving objects that can hit each other, with the cooldown between hits and what a hit counts as
+    __slots__ = ('obj1', 'obj2', 'cooldown', 'rank', 'touch_index', 'event')
+
+    def __init__(self, obj1, obj2, cooldown, rank, touch_index=None, event=None):
+        self.obj1 = obj1
+        self.obj2 = obj2
+        self.cooldown = cooldown  # [tick it can hit again from, ticks a hit cools it down for]
+        self.rank = rank  # pairs that touch in the same tick are resolved from lowest rank to highest
+        self.touch_index = touch_index  # which entry of touches a hit adds to, None doesn't count
+        self.event = event  # event a hit adds to step's list, None adds nothing
+
+
+class Match(object):
+    # everything the physics needs to step a match, with no window, sound or clock attached
+    # ball, fennec (blue) and octane (orange) always play, extra_cars are (car, team) and extra_balls more balls
+    def __init__(self, ball, fennec, octane, total_time, frame_rate, physics_rate=PHYSICS_BASE_RATE,
+                 extra_cars=(), extra_balls=()):
+        self.ball = ball
+        self.fennec = fennec
+        self.octane = octane
+        self.total_time = total_time
+        self.frame_rate = frame_rate
+        self.balls = [self.ball] + list(extra_balls)
+        self.cars = [self.fennec, self.octane] + [car for car, team in extra_cars]
+        self.teams = [0, 1] + [team for car, team in extra_cars]  # the team of each of cars
+        self.game_objects = self.balls + self.cars
+
+        # create field structures
+        self.ground = Structure(0, 680, 1440, 150)  # hitbox for ground
+        self.ceiling = Structure(0, 0, 1440, 75)  # hitbox for ceiling
+        self.left_wall = Wall(0, 0, 75, 475)  # hitbox for left wall
+        self.right_wall = Wall(1365, 0, 75, 475)  # hitbox for right_wall
+        self.left_goal = Structure(0, 475, 60, 205)  # hitbox for left goal
+        self.right_goal = Structure(1380, 475, 60, 205)  # hitbox for right goal
+
+        # physics
+        self.gravity = 1  # g-field acceleration
+        self.friction = .35  # friction coefficient
+        self.thrust_speed_limit = 15  # how fast a car's velocity can be while driving on ground
+        self.boost_speed_limit = 25  # how fast a car can boost
+        self.boost_regen_rate = 0.05  # boost gained back every 30 fps frame
+        self.elastic_collisions = True  # if False, hits lose energy based on the objects' elasticity
+        self.continuous_collisions = False  # if True, fast objects hit what they would pass through in one tick
+
+        # collisions, every two objects are a ContactPair, resolved in the order they are added when they touch
+        # in the same tick: cars with each other, then each ball with the cars from last to first, then the balls
+        self.contact_pairs = {}  # (id, id) of two objects, either way round: ContactPair
+        self.contact_list = []  # every ContactPair once, in rank order
+        for i, car in enumerate(self.cars):
+            for other in self.cars[i + 1:]:
+                self.add_contact_pair(car, other)
+        for ball in self.balls:
+            for car, team in reversed(list(zip(self.cars, self.teams))):
+                self.add_contact_pair(car, ball, team, 'touch ' + TEAM_NAMES[team])
+        for i, ball in enumerate(self.balls):
+            for other in self.balls[i + 1:]:
+                self.add_contact_pair(ball, other)
+        # cooldowns, [tick the pair can hit again from, ticks a hit cools it down for], nothing counts them every tick
+        self.all_cooldowns = [pair.cooldown for pair in self.contact_list]
+        self.set_physics_rate(physics_rate)
+        self.broad_phase = SweepAndPrune()
+        for obj in self.game_objects:
+            self.broad_phase.add_object(obj)
+        # walls reach up and out past the screen so every box hit_bottom_of_wall could catch is still a candidate
+        self.broad_phase.add_static(self.left_wall, -INFINITY, -INFINITY, self.left_wall.x + self.left_wall.w,
+                                    self.left_wall.y + self.left_wall.h)
+        self.broad_phase.add_static(self.right_wall, self.right_wall.x, -INFINITY, INFINITY,
+                                    self.right_wall.y + self.right_wall.h)
+        self.broad_phase.add_static(self.ceiling, self.ceiling.x, self.ceiling.y, self.ceiling.x + self.ceiling.w,
+                                    self.ceiling.y + self.ceiling.h)
+        # with fewer objects than this, checking every pair is cheaper than sweeping (bench_broadphase.py)
+        self.broad_phase_min_objects = 12
+        self.structure_pairs = [(obj, structure) for obj in self.game_objects
+                                for structure in (self.left_wall, self.right_wall, self.ceiling)]
+        # status
+        self.PREGAME = PREGAME
+        self.MAIN_GAME = MAIN_GAME
+        self.TIME_RAN_OUT = TIME_RAN_OUT
+        self.OVERTIME = OVERTIME
+        self.GAME_OVER = GAME_OVER
+        self.status = self.PREGAME  # start game in main game
+
+        # clock, counted in physics ticks so the match plays the same however fast it is simulated
+        self.ticks = 0  # physics ticks since kickoff
+        self.overtime_start_tick = -1
+        self.touches = [0, 0]  # ball touches by fennec, octane
+        self.profiler = None  # a FrameProfiler that step tells apart collisions from the rest of the physics
+
+    def set_physics_rate(self, physics_rate):
+        # the physics is stepped physics_rate times a second, no matter how often the screen is drawn
+        self.physics_rate = physics_rate
+        self.dt = PHYSICS_BASE_RATE / physics_rate  # how many 30 fps frames one tick lasts
+        for cooldown in self.all_cooldowns:
+            cooldown[1] = max(1, round(5 / self.dt))  # cooldowns last 5 frames at 30 fps, and at least a tick
+
+    def add_contact_pair(self, obj1, obj2, touch_index=None, event=None):
+        pair = ContactPair(obj1, obj2, [0, 5], len(self.contact_list), touch_index, event)
+        self.contact_pairs[(id(obj1), id(obj2))] = pair
+        self.contact_pairs[(id(obj2), id(obj1))] = pair
+        self.contact_list.append(pair)
+        return pair
+
+    def candidate_pairs(self, dt=0):
+        # (ContactPairs in rank order, (object, structure) pairs) that might touch, see SweepAndPrune.update for dt
+        # with only a few objects every pair is a candidate, that's cheaper than sweeping
+        if len(self.game_objects) < self.broad_phase_min_objects:
+            return self.contact_list, self.structure_pairs
+        self.broad_phase.update(dt)
+        object_pairs, structure_pairs = self.broad_phase.pairs()
+        contacts = []
+        for obj1, obj2 in object_pairs:
+            pair = self.contact_pairs.get((id(obj1), id(obj2)))
+            if pair is not None:
+                contacts.append(pair)
+        contacts.sort(key=lambda contact: contact.rank)
+        return contacts, structure_pairs
+
+    def team_score(self, team):  # every car of a team carries the team's score
+        for car, car_team in zip(self.cars, self.teams):
+            if car_team == team:
+                return car.score
+        return 0
+
+    def time_left(self):  # seconds left in regulation, negative once it runs out
+        return self.total_time - self.ticks / self.physics_rate
+
+    def is_playing(self):
+        return self.status == self.MAIN_GAME or self.status == self.TIME_RAN_OUT or self.status == self.OVERTIME
+
+    def reset_objects(self):
+        for obj in self.game_objects:
+            obj.reset()
+
+    def reset_cooldowns(self):
+        for cooldown in self.all_cooldowns:
+            cooldown[0] = 0
+
+    def hit_bottom_of_wall(self, w_obj):  # sees if object is going to hit either ceiling of wall
+        # check left: if left of car is to the left of the right edge of the left wall
+        # or
+        # check right: if right of car is to the right of the left edge of the right wall
+        # if collided but before it collided it was under the wall
+        previous_top = w_obj.hitbox[1] - w_obj.vel_y * self.dt  # where the top was one tick ago
+        return (w_obj.vel_y < 0 and
+                (w_obj.hitbox[0] < self.left_wall.hitbox[0] + self.left_wall.hitbox[2] and
+                 w_obj.hitbox[1] < self.left_wall.hitbox[1] + self.left_wall.hitbox[3] < previous_top)
+                or
+                (w_obj.hitbox[0] + w_obj.hitbox[2] > self.right_wall.hitbox[0] and
+                 (w_obj.hitbox[1] < self.right_wall.hitbox[1] + self.right_wall.hitbox[3] < previous_top)))
+
+    def take_gravity(self, g_obj):
+        take_gravity(g_obj, self.ground.hitbox, self.dt)
+
+
+def apply_car_input(state, car, car_input):
+    # x-axis
+    if car_input.left:
+        car.facing = 'left'
+    elif car_input.right:
+        car.facing = 'right'
+
+    if car_input.left and car.vel_x > -state.thrust_speed_limit and car.hitbox[0] > 0:
+        car.drive_forward('left')
+    else:  # if not driving left, don't let it thrust left
+        car.forces.drive_left = 0.0
+    if car_input.right and car.vel_x < state.thrust_speed_limit and car.hitbox[0] + car.hitbox[2] < 1440:
+        car.drive_forward('right')
+    else:  # if not driving right, don't let it thrust right
+        car.forces.drive_right = 0.0
+
+    # boost
+    if (car_input.up and car.boost_left > 0 and car.jumps_remaining <= 0 and
+            car.forces.boost_up != car.boost_thrust_up and car.get_accel_y() > -car.gravity):
+        car.boost_forward('up', state.dt)
+        car.images_active[2] = True
+    else:
+        car.forces.boost_up = 0.0
+        car.images_active[2] = False
+    if (car_input.boost and car.boost_left > 0 and car.facing == 'left' and
+            car.vel_x > -state.boost_speed_limit):
+        car.boost_forward('left', state.dt)
+        car.images_active[0] = True
+    else:
+        if car.forces.boost == car.boost_thrust * -1:
+            car.forces.boost = 0.0
+        car.images_active[0] = False
+    if (car_input.boost and car.boost_left > 0 and car.facing == 'right' and
+            car.vel_x < state.boost_speed_limit):
+        car.boost_forward('right', state.dt)
+        car.images_active[1] = True
+    else:
+        if car.forces.boost == car.boost_thrust:
+            car.forces.boost = 0.0
+        car.images_active[1] = False
+
+    take_friction(car, state.dt)  # make car take friction
+
+    car.boost_left += state.boost_regen_rate * state.dt
+    car.boost_left = min(car.boost_left, 100)
+
+    # y-axis
+    if car.is_grounded:
+        car.jumps_remaining = 2
+    if car_input.jump:
+        if car.jumps_remaining == 1:  # can only flip if already used jump in air
+            if car_input.left:
+                car.flip_forward('left')
+            elif car_input.right:
+                car.flip_forward('right')
+            else:
+                car.jump_up()
+        else:  # first jump has to be up, not a flip
+            car.jump_up()
+
+
+def resolve_collision(state, obj1, obj2, cooldown):
+    if state.elastic_collisions:
+        collision_set_new_velocities(obj1, obj2)
+    else:
+        collision_set_new_velocities(obj1, obj2, restitution_between(obj1, obj2))
+    objects_collided_vertically(obj1, obj2)  # fix vertical collisions
+    objects_collided_vertically(obj2, obj1)
+    cooldown[0] = state.ticks + cooldown[1]
+
+
+def collide(state, obj1, obj2, cooldown):
+    if state.ticks >= cooldown[0] and objects_are_touching(obj1, obj2):
+        resolve_collision(state, obj1, obj2, cooldown)
+        return True
+    return False
+
+
+def earliest_hit(state, span):
+    # the first two things that meet when everything keeps its velocity for span (in ticks of dt), as
+    # (t from 0 to 1 of the span, order, ContactPair or (object,) for a boundary, axis), or None
+    # cooldowns don't matter here: only things closing in on each other meet, never ones still overlapping from a hit
+    contacts, structure_pairs = state.candidate_pairs(span)  # boxes cover the whole path of the span
+    first = None
+    for pair in contacts:
+        obj1 = pair.obj1
+        obj2 = pair.obj2
+        impact = time_of_impact(obj1.hitbox, obj2.hitbox, (obj1.vel_x - obj2.vel_x) * span,
+                                (obj1.vel_y - obj2.vel_y) * span)
+        if impact is not None and (first is None or (impact[0], pair.rank) < (first[0], first[1])):
+            first = (impact[0], pair.rank, pair, impact[1])
+    for obj, structure in structure_pairs:
+        impact = time_of_impact(obj.hitbox, structure.hitbox, obj.vel_x * span, obj.vel_y * span)
+        if impact is not None:
+            order = len(state.contact_list) + state.game_objects.index(obj)
+            if first is None or (impact[0], order) < (first[0], first[1]):
+                first = (impact[0], order, (obj,), impact[1])
+    return first
+
+
+def move_objects(state, events):
+    # moves every object by its velocity for one tick, stopping everything where the first two things would meet,
+    # bouncing those, and sweeping the rest of the tick again from there, so nothing passes through anything
+    dt = state.dt
+    left = 1.0  # part of the tick still to move
+    for hit_count in range(MAX_SWEEP_HITS):
+        first = earliest_hit(state, left * dt)
+        if first is None:
+            break
+        t, order, hit, axis = first
+        t = max(0.0, t - 1e-6) * left  # stop a hair short, so rounding never leaves them overlapping
+        for obj in state.game_objects:  # up to where they meet
+            obj.x += obj.vel_x * dt * t
+            obj.y += obj.vel_y * dt * t
+            obj.update_hitbox()
+        left -= t
+        if isinstance(hit, ContactPair):
+            resolve_collision(state, hit.obj1, hit.obj2, hit.cooldown)
+            if hit.event is not None:
+                state.touches[hit.touch_index] += 1
+                events.append(hit.event)
+        elif axis == 'x':  # side of a wall
+            hit[0].vel_x = -hit[0].vel_x
+        else:  # bottom of a wall or the ceiling
+            hit[0].vel_y *= -1
+
+    for obj in state.game_objects:  # the rest of the tick
+        obj.x += obj.vel_x * dt * left
+        obj.y += obj.vel_y * dt * left
+
+
+def score_goal(state, team):
+    # team scored, returns the winner if the goal ends the match, otherwise None
+    for car, car_team in zip(state.cars, state.teams):
+        if car_team == team:
+            car.score += 1
+            car.boost_left = min(100, car.boost_left + 25)
+        else:
+            car.boost_left = min(100, car.boost_left + 50)
+    if state.status == state.MAIN_GAME or state.status == state.TIME_RAN_OUT:
+        state.reset_objects()
+    elif state.status == state.OVERTIME:
+        state.status = state.GAME_OVER
+        return TEAM_NAMES[team]
+    return None
+
+
+def step(state, inputs):
+    # advances the match by one physics tick, inputs holds one CarInput per car in state.cars (fennec, octane...)
+    # returns a list of what happened this frame: 'goal blue', 'goal orange', 'touch blue', 'winner blue', 'winner orange'
+    events = []
+    profiler = state.profiler
+    if state.status == state.MAIN_GAME and state.time_left() <= 0:
+        state.status = state.TIME_RAN_OUT
+    state.ticks += 1
+
+    # check if objects are grounded
+    for obj in state.game_objects:
+        obj.is_grounded = not obj.is_falling(state.ground.hitbox, state.dt)
+
+    if state.status == state.TIME_RAN_OUT and all(
+            ball.hitbox[1] + ball.hitbox[3] + ball.vel_y * state.dt >= state.ground.hitbox[1] for ball in state.balls):
+        state.status = state.GAME_OVER
+
+    if state.is_playing():
+        for car, car_input in zip(state.cars, inputs):
+            apply_car_input(state, car, car_input)
+
+    if profiler is not None:
+        profiler.mark('physics')
+    # the broad phase finds what might be touching, the exact checks only run on those
+    contacts, structure_pairs = state.candidate_pairs()
+    near_boundary = None  # every object is near one when every pair is a candidate
+    if structure_pairs is not state.structure_pairs:
+        near_boundary = set(id(obj) for obj, structure in structure_pairs)
+
+    # collisions of objects
+    for pair in contacts:
+        if collide(state, pair.obj1, pair.obj2, pair.cooldown) and pair.event is not None:
+            state.touches[pair.touch_index] += 1
+            events.append(pair.event)
+
+    # collisions of objects into boundaries, objects near no boundary can't hit one
+    for obj in state.game_objects:
+        if near_boundary is not None and id(obj) not in near_boundary:
+            continue
+        if objects_are_touching(obj, state.left_wall) or objects_are_touching(obj, state.right_wall):
+            if not (isinstance(obj, Ball) and state.hit_bottom_of_wall(obj)):
+                obj.vel_x = -obj.vel_x  # bounce off walls
+        if state.hit_bottom_of_wall(obj) or objects_are_touching(obj, state.ceiling):
+            obj.vel_y *= -1
+    for car in state.cars:
+        if car.hitbox[0] < 0 or car.hitbox[0] + car.hitbox[2] > 1440:
+            car.vel_x = -car.vel_x
+    if profiler is not None:
+        profiler.mark('collisions')
+
+    # if someone scores
+    for ball in state.balls:
+        if ball.hitbox[0] + ball.hitbox[2] < 0:  # if oranges scores in blue goal
+            events.append('goal orange')
+            winner = score_goal(state, 1)
+            if winner is not None:
+                events.append('winner ' + winner)
+                return events
+        if ball.hitbox[0] > 1440:  # if blue scores in orange goal
+            events.append('goal blue')
+            winner = score_goal(state, 0)
+            if winner is not None:
+                events.append('winner ' + winner)
+                return events
+
+    # cars that leave the field are put back
+    for car in state.cars:
+        if car.x + car.w < 0 or car.x > 1440:
+            car.reset()
+
+    if state.is_playing():
+        dt = state.dt
+        for obj in state.game_objects:  # accelerate all objects in both directions
+            state.take_gravity(obj)
+            obj.vel_x += obj.get_accel_x() * dt
+            obj.vel_y += obj.get_accel_y() * dt
+        if state.continuous_collisions:
+            move_objects(state, events)
+        else:
+            for obj in state.game_objects:
+                obj.x += obj.vel_x * dt
+                obj.y += obj.vel_y * dt
+
+    for obj in state.game_objects:
+        obj.update_hitbox()
+    return events
+
+
+def match_winner(state):
+    blue = state.team_score(0)
+    orange = state.team_score(1)
+    if blue > orange:
+        return 'blue'
+    elif orange > blue:
+        return 'orange'
+    return 'tie'
+
+
+def start_overtime(state):
+    state.status = state.OVERTIME
+    state.overtime_start_tick = state.ticks
+    state.reset_objects()
+
+
+class HeadlessMatch(Match):
+    # runs a whole match as fast as the cpu allows
+    def __init__(self, total_time=45, frame_rate=30, ball=None, fennec=None, octane=None, extra_cars=(),
+                 extra_balls=()):
+        # frame_rate is also the physics rate, every frame is one physics tick
+        super(HeadlessMatch, self).__init__(ball or make_ball(), fennec or make_fennec(), octane or make_octane(),
+                                            total_time, frame_rate, frame_rate, extra_cars, extra_balls)
+        self.winner = None
+
+    def reset(self):
+        for car, team in zip(self.cars, self.teams):
+            car.score = 0
+            car.boost_left = 100
+            car.facing = 'right' if team == 0 else 'left'
+        self.reset_objects()
+        self.reset_cooldowns()
+        self.ticks = 0
+        self.overtime_start_tick = -1
+        self.winner = None
+        self.touches = [0, 0]
+        self.status = self.MAIN_GAME
+
+    def is_over(self):
+        return self.winner is not None
+
+    def step(self, fennec_input=NO_INPUT, octane_input=NO_INPUT, *extra_inputs):
+        # extra_inputs drive extra_cars, in order, the ones left out get NO_INPUT
+        inputs = (fennec_input, octane_input) + extra_inputs + (NO_INPUT,) * (len(self.cars) - 2 - len(extra_inputs))
+        events = step(self, inputs)
+        for event in events:
+            if event.startswith('winner'):
+                self.winner = event.split(' ')[1]
+        if self.status == self.GAME_OVER and self.winner is None:
+            winner = match_winner(self)
+            if winner == 'tie':
+                start_overtime(self)
+            else:
+                self.winner = winner
+        return events
+
+    def run(self, policy=None, max_ticks=None, max_overtime_ticks=None):
+        # policy(match) returns (fennec_input, octane_input), no policy means nobody touches the controls
+        # returns the winner, or None if max_ticks or max_overtime_ticks (counted from the start of overtime) ran out
+        self.reset()
+        while not self.is_over():
+            if max_ticks is not None and self.ticks >= max_ticks:
+                break
+            if (max_overtime_ticks is not None and self.status == self.OVERTIME and
+                    self.ticks - self.overtime_start_tick >= max_overtime_ticks):
+                break
+            if policy is None:
+                self.step()
+            else:
+                fennec_input, octane_input = policy(self)
+                self.step(fennec_input, octane_input)
+        return self.winner
@@ -0,0 +1,191 @@
+from batch import BatchArena
+from bots import BOTS, make_bot
+from engine import *
+import numpy as np
+
+
+# an action is one car's packed input bits (engine.INPUT_*), so 0 to 31
+ACTION_COUNT = 32
+
+# every observation is OBSERVATION_SIZE float32s, scaled to roughly -1 to 1:
+#   0-3    ball x, y, vel x, vel y
+#   4-10   the agent's car: x, y, vel x, vel y, boost, jumps remaining, facing (-1 left, 1 right)
+#   11-17  the other car, the same way
+#   18-19  the agent's score, the other team's score
+#   20     regulation time left, 0 once it runs out
+#   21     1 in overtime, otherwise 0
+OBSERVATION_SIZE = 22
+FIELD_W = 1440
+FIELD_H = 800
+SPEED_SCALE = 25  # boost speed limit
+
+
+class MatchEnv(object):
+    # one match for training an agent to drive one of the cars, the other car is driven by opponent
+    # opponent(match) returns a CarInput or input bits for the other car, no opponent leaves it parked
+    # opponent can also be the name of a bot (bots.BOTS), made again from the seed at every reset
+    def __init__(self, team='blue', opponent=None, total_time=45, physics_rate=PHYSICS_BASE_RATE,
+                 action_repeat=1, goal_reward=1.0, touch_reward=0.1, max_ticks=None):
+        self.match = HeadlessMatch(total_time=total_time, frame_rate=physics_rate)
+        self.team = team
+        self.own_index = 0 if team == 'blue' else 1  # index into match.cars and match.touches
+        if isinstance(opponent, str) and opponent not in BOTS:
+            raise KeyError(f'no bot called {opponent}, pick one of {", ".join(BOTS)}')
+        self.opponent = opponent
+        self.bot = None  # the bot driving the other car when opponent is a name
+        self.action_repeat = action_repeat  # physics ticks per step, the same action is held for all of them
+        self.goal_reward = goal_reward  # scoring, conceding is the negative
+        self.touch_reward = touch_reward  # the agent's car touching the ball
+        self.max_ticks = max_ticks  # a match that goes on longer is cut off, None plays until someone wins
+        self.inputs = [CarInput.from_bits(bits) for bits in range(ACTION_COUNT)]  # made once, reused every step
+        self.observation = np.zeros(OBSERVATION_SIZE, dtype=np.float32)  # filled in again every step
+        self.info = {'ticks': 0, 'winner': None, 'score': [0, 0], 'touches': [0, 0]}
+        self.np_random = np.random.default_rng()
+
+    def reset(self, seed=None):
+        # the match itself has no randomness, every kickoff is the same, so the seed only reaches the bot opponent
+        # and np_random (for whatever else the training wants to randomize): the same seed and actions replay
+        # the same episode, with an opponent function that's up to the function
+        self.np_random = np.random.default_rng(seed)
+        if isinstance(self.opponent, str):
+            self.bot = make_bot(self.opponent, seed)
+        self.match.reset()
+        return self.observe()
+
+    def get_input(self, action):
+        if isinstance(action, CarInput):
+            return action
+        return self.inputs[action]
+
+    def step(self, action):
+        # returns (observation, reward, done, info), observation and info are reused by the next step
+        match = self.match
+        own_input = self.get_input(action)
+        scored = 'goal ' + self.team
+        conceded = 'goal orange' if self.team == 'blue' else 'goal blue'
+        touched = 'touch ' + self.team
+        reward = 0.0
+        for repeat in range(self.action_repeat):
+            if self.bot is not None:
+                other_input = self.bot.act(match, 1 - self.own_index)
+            elif self.opponent is None:
+                other_input = NO_INPUT
+            else:
+                other_input = self.get_input(self.opponent(match))
+            if self.own_index == 0:
+                events = match.step(own_input, other_input)
+            else:
+                events = match.step(other_input, own_input)
+            for event in events:
+                if event == scored:
+                    reward += self.goal_reward
+                elif event == conceded:
+                    reward -= self.goal_reward
+                elif event == touched:
+                    reward += self.touch_reward
+            if match.is_over():
+                break
+        done = match.is_over() or (self.max_ticks is not None and match.ticks >= self.max_ticks)
+        info = self.info
+        info['ticks'] = match.ticks
+        info['winner'] = match.winner
+        info['score'][0] = match.fennec.score
+        info['score'][1] = match.octane.score
+        info['touches'][0] = match.touches[0]
+        info['touches'][1] = match.touches[1]
+        return self.observe(), reward, done, info
+
+    def observe(self):
+        match = self.match
+        obs = self.observation
+        ball = match.ball
+        obs[0] = ball.x / FIELD_W
+        obs[1] = ball.y / FIELD_H
+        obs[2] = ball.vel_x / SPEED_SCALE
+        obs[3] = ball.vel_y / SPEED_SCALE
+        own = match.cars[self.own_index]
+        other = match.cars[1 - self.own_index]
+        for start, car in ((4, own), (11, other)):
+            obs[start] = car.x / FIELD_W
+            obs[start + 1] = car.y / FIELD_H
+            obs[start + 2] = car.vel_x / SPEED_SCALE
+            obs[start + 3] = car.vel_y / SPEED_SCALE
+            obs[start + 4] = car.boost_left / 100
+            obs[start + 5] = car.jumps_remaining / 2
+            obs[start + 6] = 1.0 if car.facing == 'right' else -1.0
+        obs[18] = own.score
+        obs[19] = other.score
+        obs[20] = max(match.time_left(), 0) / match.total_time
+        obs[21] = 1.0 if match.status == match.OVERTIME else 0.0
+        return obs
+
+
+class BatchMatchEnv(object):
+    # n matches stepped together on a BatchArena (30 ticks a second only), for when one match at a time is too slow
+    # actions, observations, rewards and dones all have one row per match, finished matches restart by themselves
+    # opponent(arena) returns an array of n input bits for the other car
+    def __init__(self, n, team='blue', opponent=None, total_time=45, goal_reward=1.0, touch_reward=0.1,
+                 physics_rate=PHYSICS_BASE_RATE):
+        if physics_rate != PHYSICS_BASE_RATE:  # BatchArena has no dt scaling, use MatchEnv for other rates
+            raise ValueError(f'BatchMatchEnv only runs at {PHYSICS_BASE_RATE} ticks a second, not {physics_rate}')
+        self.arena = BatchArena(n, total_time=total_time, frame_rate=physics_rate)
+        self.n = n
+        self.own_index = 0 if team == 'blue' else 1
+        self.opponent = opponent
+        self.goal_reward = goal_reward
+        self.touch_reward = touch_reward
+        self.inputs = np.zeros((n, 2), dtype=np.int32)
+        self.observations = np.zeros((n, OBSERVATION_SIZE), dtype=np.float32)
+        self.rewards = np.zeros(n, dtype=np.float32)
+        self.dones = np.zeros(n, dtype=bool)
+        self.last_score = np.zeros((n, 2), dtype=np.int32)
+        self.last_touches = np.zeros(n, dtype=np.int32)
+
+    def reset(self, seed=None):
+        # like the match, the arena has no randomness, seed is only taken to look like MatchEnv.reset
+        self.arena.reset()
+        self.last_score[:] = 0
+        self.last_touches[:] = 0
+        return self.observe()
+
+    def step(self, actions):
+        # returns (observations, rewards, dones, winners), all reused by the next step
+        arena = self.arena
+        own = self.own_index
+        self.inputs[:, own] = actions
+        self.inputs[:, 1 - own] = 0 if self.opponent is None else self.opponent(arena)
+        arena.step(self.inputs)
+
+        rewards = self.rewards
+        goals_for = arena.score[:, own] - self.last_score[:, own]
+        goals_against = arena.score[:, 1 - own] - self.last_score[:, 1 - own]
+        np.multiply(goals_for - goals_against, self.goal_reward, out=rewards, casting='unsafe')
+        rewards += (arena.touches[:, own] - self.last_touches) * self.touch_reward
+        np.not_equal(arena.winner, -1, out=self.dones)
+        winners = arena.winner.copy()
+        if self.dones.any():
+            arena.reset(self.dones)
+        self.last_score[:] = arena.score
+        self.last_touches[:] = arena.touches[:, own]
+        return self.observe(), rewards, self.dones, winners
+
+    def observe(self):
+        arena = self.arena
+        obs = self.observations
+        np.divide(arena.ball_x, FIELD_W, out=obs[:, 0], casting='unsafe')
+        np.divide(arena.ball_y, FIELD_H, out=obs[:, 1], casting='unsafe')
+        np.divide(arena.ball_vel_x, SPEED_SCALE, out=obs[:, 2], casting='unsafe')
+        np.divide(arena.ball_vel_y, SPEED_SCALE, out=obs[:, 3], casting='unsafe')
+        for start, car in ((4, self.own_index), (11, 1 - self.own_index)):
+            np.divide(arena.car_x[:, car], FIELD_W, out=obs[:, start], casting='unsafe')
+            np.divide(arena.car_y[:, car], FIELD_H, out=obs[:, start + 1], casting='unsafe')
+            np.divide(arena.car_vel_x[:, car], SPEED_SCALE, out=obs[:, start + 2], casting='unsafe')
+            np.divide(arena.car_vel_y[:, car], SPEED_SCALE, out=obs[:, start + 3], casting='unsafe')
+            np.divide(arena.boost_left[:, car], 100, out=obs[:, start + 4], casting='unsafe')
+            np.divide(arena.jumps_remaining[:, car], 2, out=obs[:, start + 5], casting='unsafe')
+            obs[:, start + 6] = arena.facing[:, car]
+        obs[:, 18] = arena.score[:, self.own_index]
+        obs[:, 19] = arena.score[:, 1 - self.own_index]
+        np.divide(np.maximum(arena.time_left(), 0), arena.total_time, out=obs[:, 20], casting='unsafe')
+        np.equal(arena.status, OVERTIME, out=obs[:, 21], casting='unsafe')
+        return obs
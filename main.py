@@ -1,35 +1,92 @@
-from objects import *
+from assets import assets
+from audio import announcer
+from engine import make_ball, make_fennec, make_octane
 from Game import Game
+from compositor import create_window
+from controllers import make_controller
+from netplay import UdpTransport
+import os
 import pygame
+import time
+
+VSYNC = False  # wait for the monitor before showing a frame
+SCALED = False  # let the window be resized, the game is scaled to fit
+WINDOW_SIZE = (1440, 800)  # the game is laid out for 1440x800, other sizes are scaled to fit with bars on the sides
+RENDER_SIZE = None  # draw at a smaller size, like (960, 533), that the window scales up, None draws at WINDOW_SIZE
+FULLSCREEN = False
+FRAME_RATE = 60  # frames drawn per second
+PHYSICS_RATE = 120  # physics ticks per second, the game plays the same whatever the frame rate is
+CONTROLLERS = ('keyboard', 'keyboard')  # blue then orange: 'keyboard', 'joystick', 'joystick 1'... or a bot name
+CONTINUOUS_COLLISIONS = False  # stop fast objects where they meet instead of letting them pass through in one tick
+BALL_ROTATION_STEPS = 64  # how many angles the spinning ball is drawn at, each one is made when the game loads
+PRINT_ASSET_LOAD_TIMES = False  # print how long every image took to load once the game closes
+RECORD_REPLAYS = False  # save every match's inputs to the replays folder, play them back with replay.py
+REPLAY_FOLDER = 'replays'
+NETPLAY_REMOTE = None  # play online against ('address', port) of the other player, who sets this one's address
+NETPLAY_PORT = 50007  # the UDP port this game listens on
+NETPLAY_CAR = 0  # the car this player drives online, 0 blue, 1 orange, the other player picks the other one
+NETPLAY_INPUT_DELAY = 2  # ticks, more makes rollbacks rarer but the controls feel later
+PROFILE_FRAMES = False  # save how long each part of every frame took to the profiles folder, F3 shows it in game
+PROFILE_FORMAT = 'csv'  # or 'json'
+CPROFILE_FIRST_MATCH = False  # also save a cProfile of the first match to the profiles folder
+PROFILE_FOLDER = 'profiles'
 
 if __name__ == '__main__':
     pygame.display.set_caption("Rocket League 2D")  # set title of window
-    game_window = pygame.display.set_mode((1440, 800))  # create full screen window
-    ball_image = pygame.image.load('images/ball.png')
-    fennec_images = [pygame.image.load('images/fennec_left.png'),  # in website, did 86x60
-                     pygame.image.load('images/fennec_right.png'),
-                     pygame.image.load('images/fennec_boost_left.png'),
-                     pygame.image.load('images/fennec_boost_right.png'),
-                     pygame.image.load('images/fennec_hover.png')]
-    octane_images = [pygame.image.load('images/octane_left.png'),  # load octane image
-                     pygame.image.load('images/octane_right.png'),
-                     pygame.image.load('images/octane_boost_left.png'),
-                     pygame.image.load('images/octane_boost_right.png'),
-                     pygame.image.load('images/octane_hover.png')]
-    game_ball_template = Ball(window=game_window, x=720, y=200, radius=30, mass=1, image=ball_image,
-                              gravity=1, friction=.35, elasticity=.8)
-    game_fennec_template = Car(window=game_window, x=200, y=645, w=86, h=35, mass=3, images=fennec_images,
-                               gravity=1, friction=.35, elasticity=.1, thrust=1.5, facing='right')  # create fennec
-    game_octane_template = Car(window=game_window, x=1190, y=645, w=86, h=35, mass=3, images=octane_images,
-                               gravity=1, friction=.35, elasticity=.1, thrust=1.5, facing='left')  # create octane
+    if RENDER_SIZE is None:  # everything is drawn at the window's size
+        game_window = create_window(WINDOW_SIZE, vsync=VSYNC, scaled=SCALED, fullscreen=FULLSCREEN)
+    else:  # drawn small, the window scales each frame up on the graphics card
+        game_window = create_window(RENDER_SIZE, vsync=VSYNC, scaled=True, fullscreen=FULLSCREEN)
+    announcer.load()  # decodes the announcer in the background while the images load and the menu is up
+    ball_image = assets.image('images/ball.png')
+    fennec_images = [assets.image('images/fennec_left.png'),  # in website, did 86x60
+                     assets.image('images/fennec_right.png'),
+                     assets.image('images/fennec_boost_left.png'),
+                     assets.image('images/fennec_boost_right.png'),
+                     assets.image('images/fennec_hover.png')]
+    octane_images = [assets.image('images/octane_left.png'),  # load octane image
+                     assets.image('images/octane_right.png'),
+                     assets.image('images/octane_boost_left.png'),
+                     assets.image('images/octane_boost_right.png'),
+                     assets.image('images/octane_hover.png')]
+    game_ball_template = make_ball(image=ball_image, rotation_steps=BALL_ROTATION_STEPS)
+    game_fennec_template = make_fennec(images=fennec_images)  # create fennec
+    game_octane_template = make_octane(images=octane_images)  # create octane
 
     master_run = True
+    match_number = 0
     while master_run:
         game_ball = game_ball_template
         game_fennec = game_fennec_template
         game_octane = game_octane_template
 
+        replay_path = None
+        if RECORD_REPLAYS:
+            os.makedirs(REPLAY_FOLDER, exist_ok=True)
+            replay_path = os.path.join(REPLAY_FOLDER, time.strftime('%Y-%m-%d %H-%M-%S') + '.rlreplay')
+
+        profile_path = None
+        cprofile_path = None
+        if PROFILE_FRAMES or (CPROFILE_FIRST_MATCH and match_number == 0):
+            os.makedirs(PROFILE_FOLDER, exist_ok=True)
+            name = os.path.join(PROFILE_FOLDER, time.strftime('%Y-%m-%d %H-%M-%S'))
+            if PROFILE_FRAMES:
+                profile_path = name + '.' + PROFILE_FORMAT
+            if CPROFILE_FIRST_MATCH and match_number == 0:
+                cprofile_path = name + '.prof'
+
+        netplay_transport = None
+        if NETPLAY_REMOTE is not None:
+            netplay_transport = UdpTransport(('', NETPLAY_PORT), NETPLAY_REMOTE)
+
         game = Game(window=game_window, ball=game_ball, fennec=game_fennec, octane=game_octane,
-                    total_time=45, frame_rate=30)
+                    total_time=45, frame_rate=FRAME_RATE, physics_rate=PHYSICS_RATE, replay_path=replay_path,
+                    continuous_collisions=CONTINUOUS_COLLISIONS,
+                    controllers=[make_controller(kind, i) for i, kind in enumerate(CONTROLLERS)],
+                    profile_path=profile_path, cprofile_path=cprofile_path, netplay_transport=netplay_transport,
+                    netplay_car=NETPLAY_CAR, input_delay=NETPLAY_INPUT_DELAY)
         master_run = game.master_run
+        match_number += 1
+    if PRINT_ASSET_LOAD_TIMES:
+        print('\n'.join(assets.report()))
 pygame.quit()
@@ -0,0 +1,352 @@
+from engine import *
+from snapshot import SnapshotRing, pack_state
+import heapq
+import random
+import socket
+import struct
+import time
+
+
+# two player matches over UDP with rollback: each peer runs the whole match and sends only its own car's inputs
+# the other car's input is predicted (the last one received, held), and when the real one arrives and differs
+# the match is put back to the snapshot from before that tick and simulated again with what really happened
+# python netplay.py runs two bots against each other over loopback, with latency and packet loss if asked
+NET_MAGIC = b'RL2N'
+HELLO = struct.Struct('<4sBBBI')  # magic, type, car index, heard from the other peer, seed
+INPUTS = struct.Struct('<4sBBIIB')  # magic, type, car index, ticks received from the other peer, first tick, count
+PACKET_HELLO = 0
+PACKET_INPUTS = 1
+MAX_INPUTS_PER_PACKET = 64  # every packet repeats all unacknowledged inputs, so a lost one costs nothing
+PHYSICS_BITS = INPUT_LEFT | INPUT_RIGHT | INPUT_BOOST | INPUT_UP | INPUT_JUMP  # what a wrong guess has to roll back
+HELD_BITS = INPUT_LEFT | INPUT_RIGHT | INPUT_BOOST | INPUT_UP  # what a prediction carries over, not presses
+
+
+class UdpTransport(object):
+    # a non-blocking UDP socket to one peer, latency (seconds each way), jitter and loss are added on sending
+    # so loopback can act like a real connection, clock can be swapped for a simulated one
+    def __init__(self, local_address, remote_address, latency=0.0, jitter=0.0, loss=0.0, seed=None,
+                 clock=time.perf_counter):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(local_address)
+        self.sock.setblocking(False)
+        self.remote_address = remote_address
+        self.latency = latency
+        self.jitter = jitter
+        self.loss = loss
+        self.rng = random.Random(seed)
+        self.clock = clock
+        self.outgoing = []  # heap of (time to send, number, packet)
+        self.sent = 0
+        self.dropped = 0
+
+    def send(self, packet):
+        self.sent += 1
+        if self.loss and self.rng.random() < self.loss:
+            self.dropped += 1
+            return
+        delay = self.latency + (self.rng.uniform(0, self.jitter) if self.jitter else 0)
+        heapq.heappush(self.outgoing, (self.clock() + delay, self.sent, packet))
+        self.flush()
+
+    def flush(self):  # sends every packet whose delay is over
+        now = self.clock()
+        while self.outgoing and self.outgoing[0][0] <= now:
+            packet = heapq.heappop(self.outgoing)[2]
+            try:
+                self.sock.sendto(packet, self.remote_address)
+            except OSError:  # nobody listening yet, same as a lost packet
+                pass
+
+    def receive(self):  # every packet that arrived since the last call
+        self.flush()
+        packets = []
+        while True:
+            try:
+                packet, address = self.sock.recvfrom(2048)
+            except (BlockingIOError, ConnectionResetError):
+                return packets
+            packets.append(packet)
+
+    def close(self):
+        self.sock.close()
+
+
+class RollbackSession(object):
+    # steps match for one peer, local_index is the car this peer drives (0 fennec, 1 octane)
+    # input_delay ticks pass before a local input is used, so it usually reaches the other peer in time
+    # the match never gets more than max_rollback ticks ahead of the other peer's last known input
+    def __init__(self, match, local_index, transport, input_delay=2, max_rollback=12, seed=None, timeout=5.0):
+        self.match = match
+        self.local_index = local_index
+        self.remote_index = 1 - local_index
+        self.transport = transport
+        self.input_delay = input_delay
+        self.max_rollback = max_rollback
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)  # car 0's seed is used by both
+        self.timeout = timeout  # seconds without a packet before the other peer counts as gone
+        self.replay = None  # a Replay that gets every tick once both inputs for it are known
+        self.connected = False
+        self.heard = False  # got a hello, the other peer still has to hear ours
+        self.disconnected = False
+        self.last_packet_time = None
+
+        self.inputs = [{}, {}]  # tick: input bits of each car, only real inputs
+        self.predicted = {}  # tick: the remote input bits that tick was simulated with, while unconfirmed
+        self.snapshots = SnapshotRing(max_rollback + input_delay + 8)  # every tick that can still be rolled back
+        self.start_tick = match.ticks
+        for tick in range(self.start_tick, self.start_tick + input_delay):  # nobody can press anything this soon
+            self.inputs[0][tick] = 0
+            self.inputs[1][tick] = 0
+        self.confirmed = self.start_tick + input_delay - 1  # every remote input up to here is known
+        self.remote_acked = self.start_tick  # the other peer has all of this car's inputs before this tick
+        self.recorded = self.start_tick  # ticks before this are in the replay
+        self.rollback_tick = None  # earliest tick simulated with a wrong prediction
+        self.carry = 0  # jump and chat bits pressed while stalled, used on the next tick
+        self.chats = [0, 0]  # chat bits of real inputs since the last take_chats
+        self.rollbacks = 0
+        self.resimulated = 0
+        self.stalls = 0
+
+    def handshake(self):
+        # call until it returns True, sends hellos and listens for the other peer's
+        self.transport.send(HELLO.pack(NET_MAGIC, PACKET_HELLO, self.local_index, self.heard, self.seed))
+        self.poll()
+        return self.connected
+
+    def poll(self):  # reads every packet, remembers the earliest tick that was predicted wrong
+        now = self.transport.clock()
+        for packet in self.transport.receive():
+            if len(packet) < 5 or packet[:4] != NET_MAGIC:
+                continue
+            self.last_packet_time = now
+            if packet[4] == PACKET_HELLO and len(packet) == HELLO.size:
+                magic, kind, index, heard, seed = HELLO.unpack(packet)
+                if index != self.remote_index:
+                    continue  # both peers picked the same car
+                self.heard = True
+                if heard:
+                    self.connected = True
+                if index == 0:
+                    self.seed = seed
+            elif packet[4] == PACKET_INPUTS and len(packet) >= INPUTS.size:
+                magic, kind, index, acked, first, count = INPUTS.unpack_from(packet)
+                if index != self.remote_index or len(packet) != INPUTS.size + 2 * count:
+                    continue
+                self.connected = True  # it is already playing, so it heard us
+                self.remote_acked = max(self.remote_acked, acked)
+                self.add_remote_inputs(first, struct.unpack_from(f'<{count}H', packet, INPUTS.size))
+        if self.last_packet_time is None or not self.connected:  # waiting to connect never times out
+            self.last_packet_time = now
+        elif now - self.last_packet_time > self.timeout:
+            self.disconnected = True
+
+    def add_remote_inputs(self, first, bits_list):
+        remote = self.inputs[self.remote_index]
+        for tick, bits in enumerate(bits_list, first):
+            if tick <= self.confirmed or tick in remote:  # sent again, already have it
+                continue
+            remote[tick] = bits
+            predicted = self.predicted.pop(tick, None)
+            if predicted is not None and (predicted ^ bits) & PHYSICS_BITS:
+                if self.rollback_tick is None or tick < self.rollback_tick:
+                    self.rollback_tick = tick
+        while self.confirmed + 1 in remote:
+            self.confirmed += 1
+            self.chats[self.remote_index] |= remote[self.confirmed] & CHAT_MASK
+
+    def send_inputs(self):
+        local = self.inputs[self.local_index]
+        first = max(self.remote_acked, self.start_tick)
+        last = max(local) if local else first - 1
+        count = min(last - first + 1, MAX_INPUTS_PER_PACKET)
+        if count <= 0:
+            return
+        bits = [local.get(tick, 0) for tick in range(first, first + count)]
+        self.transport.send(INPUTS.pack(NET_MAGIC, PACKET_INPUTS, self.local_index, self.confirmed + 1, first, count) +
+                            struct.pack(f'<{count}H', *bits))
+
+    def remote_bits(self, tick):  # the real input if it's here, otherwise the last one known, held but not pressed
+        remote = self.inputs[self.remote_index]
+        bits = remote.get(tick)
+        if bits is not None:
+            return bits
+        bits = remote.get(self.confirmed, 0) & HELD_BITS
+        self.predicted[tick] = bits
+        return bits
+
+    def simulate(self, tick):
+        # steps the match from tick, returns its events, or None if it would end the match (or regulation)
+        # before the other peer's input for it is known, then the match is left before the tick
+        match = self.match
+        self.snapshots.save(match)
+        inputs = [None, None]
+        inputs[self.local_index] = CarInput.from_bits(self.inputs[self.local_index][tick])
+        inputs[self.remote_index] = CarInput.from_bits(self.remote_bits(tick))
+        for obj in match.game_objects:
+            obj.save_position()
+        events = step(match, inputs)
+        decisive = match.status == match.GAME_OVER or any(event.startswith('winner') for event in events)
+        if decisive and tick > self.confirmed:
+            self.snapshots.restore(match, tick)
+            self.predicted.pop(tick, None)
+            return None
+        return events
+
+    def roll_back(self):  # simulates again from the earliest wrong prediction, if there was one
+        match = self.match
+        rollback_tick = self.rollback_tick
+        self.rollback_tick = None
+        if rollback_tick is None or rollback_tick >= match.ticks:
+            return
+        self.rollbacks += 1
+        end = match.ticks
+        self.snapshots.restore(match, rollback_tick)
+        for tick in range(rollback_tick, end):
+            self.resimulated += 1
+            if self.simulate(tick) is None:
+                for later in range(tick + 1, end):  # never simulated now, so nothing to compare
+                    self.predicted.pop(later, None)
+                break
+
+    def advance(self, car_input):
+        # one physics tick with this peer's CarInput, returns the tick's events (goals can still be rolled back)
+        # the match doesn't move when it is too far ahead of the other peer, or can't end the match yet
+        self.poll()
+        self.roll_back()
+        tick = self.match.ticks
+        local = self.inputs[self.local_index]
+        bits = car_input.to_bits() | self.carry
+        self.carry = 0
+        events = []
+        if tick - self.confirmed > self.max_rollback:
+            self.stalls += 1  # too far ahead, wait for the other peer
+            self.carry = bits & (INPUT_JUMP | CHAT_MASK)  # a press still happens, just later
+        else:
+            if tick + self.input_delay in local:  # queued already by a tick that had to wait
+                self.carry = bits & (INPUT_JUMP | CHAT_MASK)
+            else:
+                local[tick + self.input_delay] = bits
+                self.chats[self.local_index] |= bits & CHAT_MASK
+            result = self.simulate(tick)
+            if result is None:
+                self.stalls += 1
+            else:
+                events = result
+        self.send_inputs()
+        self.record_confirmed()
+        return events
+
+    def settle(self):  # keeps talking without moving the match on, for when this peer's match is over
+        self.poll()
+        self.roll_back()
+        self.send_inputs()
+        self.record_confirmed()
+
+    def finish(self, timeout=2.0):  # once the match is over, keeps answering until the other peer has every input
+        end = time.perf_counter() + timeout
+        while self.remote_acked < self.match.ticks and time.perf_counter() < end and not self.disconnected:
+            self.settle()
+            time.sleep(0.005)
+
+    def in_sync(self):  # every tick simulated so far used the other peer's real inputs
+        return self.rollback_tick is None and self.confirmed >= self.match.ticks - 1
+
+    def record_confirmed(self):  # adds ticks that can't be rolled back any more to the replay, forgets old ones
+        last = min(self.confirmed, self.match.ticks - 1)
+        local = self.inputs[self.local_index]
+        remote = self.inputs[self.remote_index]
+        while self.recorded <= last:
+            tick = self.recorded
+            if self.replay is not None:
+                bits = [0, 0]
+                bits[self.local_index] = local[tick]
+                bits[self.remote_index] = remote[tick]
+                self.replay.record_snapshot(self.snapshots.get(tick), bits[0], bits[1])
+            if tick < self.remote_acked:
+                local.pop(tick, None)
+            if tick < self.confirmed:
+                remote.pop(tick, None)  # the last confirmed one is kept for predicting
+            self.recorded += 1
+
+    def take_chats(self):  # chat bits of both cars since the last call
+        chats = self.chats
+        self.chats = [0, 0]
+        return chats
+
+    def close(self):
+        self.transport.close()
+
+
+def finish_tick(match, events):
+    # what Game.main does after a tick: returns the winner, starts overtime if regulation ended in a tie
+    for event in events:
+        if event.startswith('winner'):
+            return event.split(' ')[1]
+    if match.status == match.GAME_OVER:
+        winner = match_winner(match)
+        if winner != 'tie':
+            return winner
+        start_overtime(match)
+    return None
+
+
+def loopback(ticks=10000, latency=0.05, jitter=0.0, loss=0.0, input_delay=2, max_rollback=12, seed=0,
+             total_time=45, physics_rate=PHYSICS_BASE_RATE):
+    # two peers with bots on one machine, the clock is simulated so it runs as fast as the physics can
+    # returns the two sessions, their winners and how many ticks of play went by
+    from bots import make_bot
+    now = [0.0]
+    clock = lambda: now[0]
+    peers = []
+    for index in range(2):
+        transport = UdpTransport(('127.0.0.1', 0), None, latency, jitter, loss, seed + index, clock)
+        match = HeadlessMatch(total_time=total_time, frame_rate=physics_rate)
+        match.reset()
+        peers.append(RollbackSession(match, index, transport, input_delay, max_rollback, seed, timeout=INFINITY))
+    peers[0].transport.remote_address = peers[1].transport.sock.getsockname()
+    peers[1].transport.remote_address = peers[0].transport.sock.getsockname()
+    tick_time = 1 / physics_rate
+    while not (peers[0].connected and peers[1].connected):
+        now[0] += tick_time
+        for peer in peers:
+            peer.handshake()
+    bots = [make_bot('chase', seed), make_bot('chase', seed + 1)]
+    winners = [None, None]
+    elapsed = 0
+    while elapsed < ticks and (None in winners or not all(peer.in_sync() for peer in peers)):
+        now[0] += tick_time
+        elapsed += 1
+        for index, peer in enumerate(peers):
+            if winners[index] is None and elapsed < ticks:
+                events = peer.advance(bots[index].act(peer.match, index))
+                winners[index] = finish_tick(peer.match, events)
+            else:
+                peer.settle()
+    return peers, winners, elapsed
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Play two bots against each other over loopback with rollback.')
+    parser.add_argument('--ticks', type=int, default=20000, help='ticks of play before stopping')
+    parser.add_argument('--latency', type=float, default=50, help='milliseconds each way')
+    parser.add_argument('--jitter', type=float, default=0, help='up to this many more milliseconds each way')
+    parser.add_argument('--loss', type=float, default=0, help='fraction of packets dropped')
+    parser.add_argument('--input-delay', type=int, default=2)
+    parser.add_argument('--max-rollback', type=int, default=12)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    start = time.perf_counter()
+    peers, winners, elapsed = loopback(args.ticks, args.latency / 1000, args.jitter / 1000, args.loss,
+                                       args.input_delay, args.max_rollback, args.seed)
+    seconds = time.perf_counter() - start
+    for index, peer in enumerate(peers):
+        match = peer.match
+        print(f'peer {index}: tick {match.ticks}, blue {match.fennec.score} - orange {match.octane.score}, '
+              f'winner {winners[index]}, {peer.rollbacks} rollbacks, {peer.resimulated} ticks simulated again, '
+              f'{peer.stalls} stalls, {peer.transport.dropped}/{peer.transport.sent} packets dropped')
+    same = pack_state(peers[0].match) == pack_state(peers[1].match)
+    print(f'{elapsed} ticks in {seconds:.2f}s, both peers ' + ('agree' if same else 'DISAGREE'))
+    for peer in peers:
+        peer.close()
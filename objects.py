@@ -1,15 +1,83 @@
+import math
 import pygame
 
 
-class Ball(object):
-    def __init__(self, window, x, y, radius, mass, image, gravity, friction, elasticity):
-        self.window = window
+class Forces(object):
+    # every force that can act on an object has its own slot, so setting or clearing one never searches a list
+    __slots__ = ('gravity', 'drive_left', 'drive_right', 'boost', 'boost_up', 'friction')
+
+    def __init__(self, gravity=0.0):
+        self.gravity = gravity  # y, weight while falling
+        self.drive_left = 0.0  # x, driving left on the ground
+        self.drive_right = 0.0  # x, driving right on the ground
+        self.boost = 0.0  # x, boosting left or right
+        self.boost_up = 0.0  # y, boosting up
+        self.friction = 0.0  # x, against the direction the object slides
+
+    def clear(self, gravity=0.0):
+        self.gravity = gravity
+        self.drive_left = 0.0
+        self.drive_right = 0.0
+        self.boost = 0.0
+        self.boost_up = 0.0
+        self.friction = 0.0
+
+    def total_x(self):
+        return self.drive_left + self.drive_right + self.boost + self.friction
+
+    def total_y(self):
+        return self.gravity + self.boost_up
+
+
+class Entity(object):
+    # what balls and cars share, with slots instead of a dict per object
+    # update_hitbox makes the hitbox, which nearly everything reads, and only remembers where the object was
+    # (box_x, box_y) for the side hitboxes, which only collisions between objects read, so they're made when asked for
+    __slots__ = ('x', 'y', 'vel_x', 'vel_y', 'previous_x', 'previous_y', 'draw_x', 'draw_y', 'hitbox', 'box_x', 'box_y')
+
+    def update_hitbox(self):
+        self.hitbox = self.make_hitbox(self.x, self.y)  # left, top, width, height
+        self.box_x = self.x
+        self.box_y = self.y
+
+    def save_position(self):  # called before every physics tick
+        self.previous_x = self.x  # position before the last physics tick
+        self.previous_y = self.y
+
+    def interpolate(self, alpha):  # where to draw between the last two physics ticks, alpha goes from 0 to 1
+        self.draw_x = self.previous_x + (self.x - self.previous_x) * alpha
+        self.draw_y = self.previous_y + (self.y - self.previous_y) * alpha
+
+    def get_accel_x(self):
+        return self.forces.total_x() / self.mass  # all forces divided by mass
+
+    def get_accel_y(self):
+        return self.forces.total_y() / self.mass  # all forces divided by mass
+
+
+class RotationTable(object):
+    # an image pre-rotated to evenly spaced angles when it's loaded, so spinning it costs nothing per frame
+    def __init__(self, image, steps=64):
+        self.steps = steps
+        self.step_angle = 360 / steps
+        # always rotated from the original image, rotating a rotated image blurs it and makes it bigger
+        self.images = [pygame.transform.rotozoom(image, -i * self.step_angle, 1) for i in range(steps)]
+
+    def get(self, angle):  # nearest image to angle degrees clockwise
+        return self.images[round(angle / self.step_angle) % self.steps]
+
+
+class Ball(Entity):
+    __slots__ = ('initial_x', 'initial_y', 'angle', 'radius', 'h', 'w', 'mass', 'gravity', 'friction',
+                 'forces', 'elasticity', 'image', 'rotations', 'image_rect', 'is_grounded')
+
+    def __init__(self, x, y, radius, mass, image, gravity, friction, elasticity, rotation_steps=64):
         self.x = x
         self.y = y
 
         self.initial_x = x
         self.initial_y = y
-        self.angle = 0  # how much the ball has rotated from normal
+        self.angle = 0  # how much the ball has rotated from normal, degrees clockwise
 
         self.radius = radius
         self.h = 2 * radius
@@ -19,41 +87,63 @@ class Ball(object):
         self.gravity = self.mass * gravity  # force of gravity on object
         self.friction = self.gravity * friction
 
-        self.force_x = []  # list of all forces acting in x direction
-        # self.force_y = self.gravity * self.mass
-        self.force_y = [self.gravity]  # list of all forces acting in y direction
+        self.forces = Forces(self.gravity)  # all forces acting on the ball
 
         self.elasticity = elasticity
         self.image = image
-        self.image_rect = self.image.get_rect(center=(300, 200))
+        self.rotations = None
+        if self.image is not None:  # headless matches have no image
+            self.image_rect = self.image.get_rect(center=(300, 200))
+            self.rotations = RotationTable(self.image, rotation_steps)
 
         self.vel_x = 0
         self.vel_y = 0
         self.is_grounded = False
-
-        self.hitbox = (self.x - self.radius, self.y - self.radius, self.radius * 2, self.radius * 2)  # left, top, w, h
-        self.left_hitbox = (self.x - self.radius, self.y + 5, 5, 2*self.radius - 10)
-        self.top_hitbox = (self.x - self.radius, self.y, 2*self.radius, 5)
-        self.right_hitbox = (self.x + 2*self.radius - 5 - self.radius, self.y + 5, 5, 2*self.radius - 10)
-        self.bottom_hitbox = (self.x - self.radius, self.y + 2*self.radius - 5, 2*self.radius, 5)
-        # left, top, width, height
         self.reset()
 
     def reset(self):
         self.x = self.initial_x  # reset to initial x position
         self.y = self.initial_y  # reset to initial y position
 
-        self.force_x = []  # reset x forces
-        self.force_y = [self.gravity]  # reset y forces
+        self.forces.clear(self.gravity)  # reset forces, only gravity is left
 
         self.vel_x = 0  # hold still
         self.vel_y = 0  # hold still
         self.is_grounded = False  # it's falling so not grounded
-        self.hitbox = (self.x - self.radius, self.y - self.radius, self.radius * 2, self.radius * 2)  # left, top, w, h
-
-    def is_falling(self, ground_hitbox):
+        self.update_hitbox()
+        self.previous_x = self.x  # a reset doesn't slide across the screen
+        self.previous_y = self.y
+        self.draw_x = self.x
+        self.draw_y = self.y
+
+    def make_hitbox(self, x, y):  # x and y are the center
+        return (x - self.radius, y - self.radius, self.radius * 2, self.radius * 2)
+
+    # only collisions between objects read these, so they are made when asked for
+    @property
+    def left_hitbox(self):
+        x, y = self.box_x, self.box_y
+        return (x - self.radius, y + 5 - self.radius, 5, 2 * self.radius - 10)
+
+    @property
+    def top_hitbox(self):
+        x, y = self.box_x, self.box_y
+        return (x - self.radius, y - self.radius, 2 * self.radius, 5)
+
+    @property
+    def right_hitbox(self):
+        x, y = self.box_x, self.box_y
+        return (x + 2*self.radius - 5 - self.radius, y + 5 - self.radius, 5, 2*self.radius - 10)
+
+    @property
+    def bottom_hitbox(self):
+        x, y = self.box_x, self.box_y
+        return (x - self.radius, y + 2 * self.radius - 5 - self.radius, 2 * self.radius, 5)
+
+    def is_falling(self, ground_hitbox, dt=1):
         # true if bottom of ball is below (>) top of ground
-        return self.hitbox[1] + self.hitbox[3] + self.vel_y < ground_hitbox[1]
+        hitbox = self.hitbox
+        return hitbox[1] + hitbox[3] + self.vel_y * dt < ground_hitbox[1]
 
     def touching_a_wall(self, left_hitbox, right_hitbox):
         # 0: left, 1: top, 2: width, 3: height
@@ -65,36 +155,22 @@ class Ball(object):
         else:
             return 0
 
-    def get_accel_x(self):
-        return float(sum(self.force_x) / self.mass)
+    def rotate_image(self):  # returns the image turned as far as the ball has rolled
+        # rolling without slipping turns the ball by distance / radius, so the angle comes from where it's drawn
+        self.angle = math.degrees(self.draw_x / self.radius) % 360
+        return self.rotations.get(self.angle)
 
-    def get_accel_y(self):
-        return float(sum(self.force_y) / self.mass)
+    def draw(self, renderer):  # returns the rect that was drawn over
+        image = renderer.image(self.rotate_image())
+        return renderer.blit_centered(image, (round(self.draw_x), round(self.draw_y)))
 
-    def update_hitbox(self):
-        self.hitbox = (self.x - self.radius, self.y - self.radius, self.radius * 2, self.radius * 2)  # left, top, w, h
-        self.left_hitbox = (self.x - self.radius, self.y + 5 - self.radius, 5, 2 * self.radius - 10)
-        self.top_hitbox = (self.x - self.radius, self.y - self.radius, 2 * self.radius, 5)
-        self.right_hitbox = (self.x + 2*self.radius - 5 - self.radius, self.y + 5 - self.radius, 5, 2*self.radius - 10)
-        self.bottom_hitbox = (self.x - self.radius, self.y + 2 * self.radius - 5 - self.radius, 2 * self.radius, 5)
-
-    def rotate_image(self):
-        change_in_angle = float(self.vel_x / self.radius)
-        self.angle += change_in_angle
-        if self.angle >= 360:
-            self.angle -= 360
-        print('angle: ' + str(self.angle))
-        # v = rw, w = v/r
-        image_clean = self.image.copy()
-        self.image = pygame.transform.rotate(image_clean, self.angle)
-
-    def draw(self):
-        self.window.blit(self.image, (self.x - self.radius, self.y - self.radius))
-
-
-class Car(object):
-    def __init__(self, window, x, y, w, h, mass, images, gravity, friction, elasticity, thrust, facing):
-        self.window = window
+
+class Car(Entity):
+    __slots__ = ('initial_x', 'initial_y', 'w', 'h', 'mass', 'gravity', 'friction', 'thrust',
+                 'boost_thrust', 'boost_thrust_up', 'forces', 'elasticity', 'images', 'images_active',
+                 'is_grounded', 'facing', 'score', 'boost_left', 'status', 'jumps_remaining')
+
+    def __init__(self, x, y, w, h, mass, images, gravity, friction, elasticity, thrust, facing):
         self.x = x
         self.y = y
         self.initial_x = x
@@ -110,8 +186,7 @@ class Car(object):
         self.boost_thrust = self.thrust * 0.75  # half as strong as normal thrust
         self.boost_thrust_up = self.gravity * -2
 
-        self.force_x = []  # list of all forces acting in x direction
-        self.force_y = [self.gravity]  # list of all forces acting in y direction
+        self.forces = Forces(self.gravity)  # all forces acting on the car
 
         self.elasticity = elasticity
         self.images = images  # array of images: left, right, left boost, right boost, hover
@@ -127,31 +202,48 @@ class Car(object):
         self.status = 'neutral'
 
         self.jumps_remaining = 1  # can double jump
-        # left top width height
-        self.hitbox = (self.x, self.y, self.w, self.h)
-        self.left_hitbox = (self.x, self.y + 5, 5, self.h - 10)
-        self.top_hitbox = (self.x, self.y, self.w, 5)
-        self.right_hitbox = (self.x + self.w - 5, self.y + 5, 5, self.h - 10)
-        self.bottom_hitbox = (self.x, self.y + self.h - 5, self.w, 5)
-
         self.reset()
 
     def reset(self):
         self.x = self.initial_x
         self.y = self.initial_y
 
-        self.force_x = []  # list of all forces acting in x direction
-        self.force_y = [self.gravity]  # list of all forces acting in y direction
+        self.forces.clear(self.gravity)  # reset forces, only gravity is left
 
         self.vel_x = 0
         self.vel_y = 0
         self.jumps_remaining = 0
         self.is_grounded = False
-        self.hitbox = (self.initial_x, self.initial_y, self.w, self.h)
+        self.update_hitbox()
+        self.previous_x = self.x  # a reset doesn't slide across the screen
+        self.previous_y = self.y
+        self.draw_x = self.x
+        self.draw_y = self.y
+
+    def make_hitbox(self, x, y):  # x and y are the top left
+        return (x, y, self.w, self.h)
+
+    # only collisions between objects read these, so they are made when asked for
+    @property
+    def left_hitbox(self):
+        return (self.box_x, self.box_y + 5, 5, self.h - 10)
+
+    @property
+    def top_hitbox(self):
+        return (self.box_x, self.box_y, self.w, 5)
 
-    def is_falling(self, ground_hitbox):
+    @property
+    def right_hitbox(self):
+        return (self.box_x + self.w - 5, self.box_y + 5, 5, self.h - 10)
+
+    @property
+    def bottom_hitbox(self):
+        return (self.box_x, self.box_y + self.h - 5, self.w, 5)
+
+    def is_falling(self, ground_hitbox, dt=1):
         # true if bottom of ball is below (>) top of ground
-        is_falling = self.hitbox[1] + self.hitbox[3] + self.vel_y < ground_hitbox[1]
+        hitbox = self.hitbox
+        is_falling = hitbox[1] + hitbox[3] + self.vel_y * dt < ground_hitbox[1]
         self.is_grounded = not is_falling  # if falling, not grounded and vice versa
         return is_falling
 
@@ -165,23 +257,26 @@ class Car(object):
 
     def drive_forward(self, direction):  # if grounded, will accelerate car
         if self.is_grounded:
-            if direction == 'left' and self.thrust * -1 not in self.force_x:
-                self.force_x.append(self.thrust * -1)
-            elif direction == 'right' and self.thrust not in self.force_x:
-                self.force_x.append(self.thrust)
-
-    def boost_forward(self, direction):  # boost even if air, activate drive, which only works on ground
-        if direction == 'left' and self.boost_thrust * -1 not in self.force_x:
-            self.drive_forward('left')
-            self.force_x.append(self.boost_thrust * -1)
-        elif direction == 'right' and self.boost_thrust not in self.force_x:
-            self.drive_forward('right')
-            self.force_x.append(self.boost_thrust)
-        elif direction == 'up' and self.boost_thrust_up not in self.force_y:
+            if direction == 'left':
+                self.forces.drive_left = self.thrust * -1
+            elif direction == 'right':
+                self.forces.drive_right = self.thrust
+
+    def boost_forward(self, direction, dt=1):  # boost even if air, activate drive, which only works on ground
+        # dt is how many 30 fps frames one physics tick lasts
+        if direction == 'left':
+            if self.forces.boost != self.boost_thrust * -1:  # just started boosting left
+                self.drive_forward('left')
+                self.forces.boost = self.boost_thrust * -1
+        elif direction == 'right':
+            if self.forces.boost != self.boost_thrust:  # just started boosting right
+                self.drive_forward('right')
+                self.forces.boost = self.boost_thrust
+        elif direction == 'up' and self.forces.boost_up != self.boost_thrust_up:
             if self.vel_y > -15:
-                self.vel_y -= 1.5
+                self.vel_y -= 1.5 * dt
 
-        self.boost_left -= 2
+        self.boost_left -= 2 * dt
 
     def flip_forward(self, direction):
         used_for_y = 2
@@ -195,35 +290,21 @@ class Car(object):
                 self.vel_x += used_for_x
             self.jumps_remaining -= 1
 
-    def get_accel_x(self):
-        return float(sum(self.force_x) / self.mass)  # all forces divided by mass
-
-    def get_accel_y(self):
-        return float(sum(self.force_y) / self.mass)  # all forces divided by mass
-
     def forces_report(self):
-        # print(f' forces in x {sum(self.force_x)}')
+        # print(f' forces in x {self.forces.total_x()}')
         pass
 
-    def draw(self):
-        # self.window.blit()
-        # pygame.draw.rect(self.window, color, self.hitbox)  # draw box around it
+    def draw(self, renderer):  # returns the rect that was drawn over
+        # renderer.fill(color, self.hitbox)  # draw box around it
         #
-        # pygame.draw.rect(self.window, (224, 229, 33), self.left_hitbox)  # draw left hitbox
-        # pygame.draw.rect(self.window, (159, 28, 171), self.top_hitbox)  # draw top hitbox
-        # pygame.draw.rect(self.window, (224, 229, 33), self.right_hitbox)  # draw right hitbox
-        # pygame.draw.rect(self.window, (159, 28, 171), self.bottom_hitbox)  # draw bottom hitbox
+        # renderer.fill((224, 229, 33), self.left_hitbox)  # draw left hitbox
+        # renderer.fill((159, 28, 171), self.top_hitbox)  # draw top hitbox
+        # renderer.fill((224, 229, 33), self.right_hitbox)  # draw right hitbox
+        # renderer.fill((159, 28, 171), self.bottom_hitbox)  # draw bottom hitbox
         if self.facing == 'left':
-            self.window.blit(self.images[0], (self.x, self.y-12))
+            return renderer.blit(renderer.image(self.images[0]), (self.draw_x, self.draw_y - 12))
         else:
-            self.window.blit(self.images[1], (self.x, self.y - 12))
-
-    def update_hitbox(self):
-        self.hitbox = (self.x, self.y, self.w, self.h)
-        self.left_hitbox = (self.x, self.y + 5, 5, self.h - 10)
-        self.top_hitbox = (self.x, self.y, self.w, 5)
-        self.right_hitbox = (self.x + self.w - 5, self.y + 5, 5, self.h - 10)
-        self.bottom_hitbox = (self.x, self.y + self.h - 5, self.w, 5)
+            return renderer.blit(renderer.image(self.images[1]), (self.draw_x, self.draw_y - 12))
 
 
 class Structure(object):
@@ -0,0 +1,80 @@
+import json
+import numpy as np
+import time
+
+
+# times each part of a drawn frame, the last capacity frames are kept in a ring buffer
+# a phase can be marked any number of times in a frame (physics and collisions run once per tick), the times add up
+PHASES = ('input', 'physics', 'collisions', 'draw', 'quick chats', 'present')
+
+
+class FrameProfiler(object):
+    def __init__(self, capacity=3600, phases=PHASES):
+        self.phases = phases
+        self.columns = {phase: i for i, phase in enumerate(phases)}
+        self.capacity = capacity  # a minute at 60 fps by default
+        self.times = np.zeros((capacity, len(phases)))  # seconds, one row per frame
+        self.ticks = np.zeros(capacity, dtype=np.int32)  # physics ticks run in each frame
+        self.frames = 0  # frames ended so far, the newest is in row (frames - 1) % capacity
+        self.row = np.zeros(len(phases))  # the frame being timed
+        self.frame_ticks = 0
+        self.last = time.perf_counter()
+
+    def begin_frame(self):
+        self.row[:] = 0
+        self.frame_ticks = 0
+        self.last = time.perf_counter()
+
+    def mark(self, phase):  # the time since the last mark (or begin_frame) was spent on phase
+        now = time.perf_counter()
+        self.row[self.columns[phase]] += now - self.last
+        self.last = now
+
+    def count_tick(self):
+        self.frame_ticks += 1
+
+    def end_frame(self):
+        index = self.frames % self.capacity
+        self.times[index] = self.row
+        self.ticks[index] = self.frame_ticks
+        self.frames += 1
+
+    def recorded(self):  # (times, ticks) of the kept frames, oldest first
+        count = min(self.frames, self.capacity)
+        start = self.frames - count
+        order = np.arange(start, self.frames) % self.capacity
+        return self.times[order], self.ticks[order]
+
+    def percentiles(self, q=(50, 99)):
+        # {phase: [milliseconds at each q]}, 'frame' is the whole frame without waiting for the next one
+        times, ticks = self.recorded()
+        if len(times) == 0:
+            return {}
+        result = {}
+        for phase, column in zip(self.phases, np.percentile(times, q, axis=0).T * 1000):
+            result[phase] = list(column)
+        result['frame'] = list(np.percentile(times.sum(axis=1), q) * 1000)
+        return result
+
+    def summary(self):  # lines for the overlay
+        lines = [f'{"phase":<12} {"p50 ms":>7} {"p99 ms":>7}']
+        for phase, (p50, p99) in self.percentiles().items():
+            lines.append(f'{phase:<12} {p50:7.2f} {p99:7.2f}')
+        return lines
+
+    def save(self, path):  # .json or anything else as csv, milliseconds
+        times, ticks = self.recorded()
+        first = self.frames - len(times)
+        if path.endswith('.json'):
+            data = {'phases': list(self.phases), 'first frame': first, 'ticks': ticks.tolist(),
+                    'milliseconds': (times * 1000).round(4).tolist(), 'percentiles': self.percentiles()}
+            with open(path, 'w') as file:
+                json.dump(data, file)
+            return
+        with open(path, 'w') as file:
+            file.write(','.join(('frame', 'ticks') + self.phases) + '\n')
+            for i in range(len(times)):
+                file.write(f'{first + i},{ticks[i]},' + ','.join(f'{t * 1000:.4f}' for t in times[i]) + '\n')
+
+    def clear(self):
+        self.frames = 0
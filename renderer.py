@@ -0,0 +1,113 @@
+from assets import assets
+from colors import get_color as gc
+from text import get_font, render_text
+import pygame
+
+
+LOGICAL_SIZE = (1440, 800)  # every position in the game is in a window this big, whatever size the real one is
+
+
+def build_arena_layer(game):
+    # draws everything that doesn't move during a match onto one surface, so it only has to be drawn once
+    view = game.viewport
+    layer = pygame.Surface(game.window.get_size()).convert()  # black where the game doesn't reach
+    layer.blit(view.image(game.bg), view.point((0, 0)))  # draw in background
+    layer.blit(view.image(game.ground_image), view.point((0, 650)))  # draw ground
+    pygame.draw.rect(layer, gc('dark gray'), view.scale_rect(game.left_wall.hitbox))  # draw left wall
+    pygame.draw.rect(layer, gc('dark gray'), view.scale_rect(game.right_wall.hitbox))  # draw right wall
+    pygame.draw.rect(layer, gc('dark gray'), view.scale_rect(game.ceiling.hitbox))  # draw ceiling
+    pygame.draw.rect(layer, gc('blue'), view.scale_rect(game.left_goal.hitbox))  # draw left goal
+    pygame.draw.rect(layer, gc('orange'), view.scale_rect(game.right_goal.hitbox))  # draw right goal
+
+    pygame.draw.rect(layer, gc('black'), view.scale_rect(game.game_clock.hitbox))  # draw top clock box
+    pygame.draw.rect(layer, gc('blue'), view.scale_rect(game.left_score.hitbox))  # draw left score
+    pygame.draw.rect(layer, gc('orange'), view.scale_rect(game.right_score.hitbox))  # draw right score
+
+    name_font = view.font('sfprotextthin', 25, True)  # names can't change once the match starts
+    fennec_name_text = render_text(name_font, game.name_fennec, gc('white'))
+    octane_name_text = render_text(name_font, game.name_octane, gc('white'))
+    pygame.draw.rect(layer, gc('blue'), view.scale_rect(game.left_boost_box.hitbox))  # draw left boost box
+    layer.blit(fennec_name_text, fennec_name_text.get_rect(center=view.point((285, 20))))
+    pygame.draw.rect(layer, gc('orange'), view.scale_rect(game.right_boost_box.hitbox))  # draw right boost box
+    layer.blit(octane_name_text, octane_name_text.get_rect(center=view.point((1155, 20))))
+    return layer
+
+
+class Viewport(object):
+    # the game is laid out for a 1440x800 window, this maps those logical coordinates to the real window:
+    # scaled as big as fits, centered, with black bars if the window is a different shape
+    # images are scaled once per size and kept, text is rendered with fonts made at the window's size
+    def __init__(self, window, logical_size=LOGICAL_SIZE):
+        self.window = window
+        self.logical_size = logical_size
+        width, height = window.get_size()
+        self.scale = min(width / logical_size[0], height / logical_size[1])
+        size = (round(logical_size[0] * self.scale), round(logical_size[1] * self.scale))
+        self.rect = pygame.Rect((width - size[0]) // 2, (height - size[1]) // 2, size[0], size[1])  # in the window
+
+    def is_native(self):  # the window is exactly the logical size, nothing is scaled
+        return self.scale == 1 and self.rect.topleft == (0, 0)
+
+    def point(self, position):  # logical (x, y), or a rect whose size is ignored like blit does, to the window's
+        return (self.rect.x + position[0] * self.scale, self.rect.y + position[1] * self.scale)
+
+    def scale_rect(self, rect):
+        left, top = self.point(rect)
+        return (left, top, rect[2] * self.scale, rect[3] * self.scale)
+
+    def to_logical(self, position):  # a point on the window, like the mouse, back to logical coordinates
+        return ((position[0] - self.rect.x) / self.scale, (position[1] - self.rect.y) / self.scale)
+
+    def image(self, surface):  # a logical size image at the window's size, only scaled the first time
+        return assets.scaled(surface, self.scale)
+
+    def font(self, name, size, bold=False, italic=False):  # size is logical, the font is made at the window's size
+        return get_font(name, max(1, round(size * self.scale)), bold, italic)
+
+
+class ArenaRenderer(object):
+    # draws moving things over the cached arena layer and only sends the rectangles that changed to the screen
+    # positions are logical, the viewport puts them on the window
+    def __init__(self, window, arena_layer, viewport=None):
+        self.window = window
+        self.arena_layer = arena_layer
+        self.viewport = viewport or Viewport(window)
+        # the start screen was on the window before, so the whole arena goes over it once
+        # overlays like the countdown are drawn through blit and get erased like everything else that moves
+        self.window.set_clip(None)
+        self.window.blit(self.arena_layer, (0, 0))
+        self.window.set_clip(self.viewport.rect)  # nothing that moves is drawn over the bars
+        self.drawn = []  # rects drawn over since the last begin_frame, erased at the next one
+        self.dirty = [self.window.get_rect()]  # rects of the window that changed since the last present
+
+    def begin_frame(self):  # erase last frame's moving things by copying the arena back over them
+        for rect in self.drawn:
+            self.window.blit(self.arena_layer, rect, rect)
+        self.dirty.extend(self.drawn)
+        self.drawn = []
+
+    def track(self, rect):  # for things drawn straight onto the window
+        if rect.width > 0 and rect.height > 0:
+            self.drawn.append(rect)
+            self.dirty.append(rect)
+        return rect
+
+    def image(self, surface):  # see Viewport.image, for images drawn with blit
+        return self.viewport.image(surface)
+
+    def font(self, name, size, bold=False, italic=False):  # see Viewport.font, for text drawn with blit
+        return self.viewport.font(name, size, bold, italic)
+
+    def blit(self, surface, position):  # surface is already at the window's size (from image or font)
+        return self.track(self.window.blit(surface, self.viewport.point(position)))
+
+    def blit_centered(self, surface, center):
+        return self.track(self.window.blit(surface, surface.get_rect(center=self.viewport.point(center))))
+
+    def fill(self, color, rect):
+        return self.track(pygame.draw.rect(self.window, color, self.viewport.scale_rect(rect)))
+
+    def present(self):
+        if self.dirty:
+            pygame.display.update(self.dirty)
+            self.dirty = []
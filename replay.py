@@ -0,0 +1,197 @@
+from array import array
+from bisect import bisect_right
+from engine import *
+from snapshot import SNAPSHOT_SIZE, pack_state, restore_state
+import struct
+import zlib
+
+
+# a replay is the seed, the physics settings and every car's inputs for every physics tick
+# header, then the number of ticks, then zlib compressed pairs of 16 bit input bits (fennec, octane) per tick
+# then keyframes: the number of keyframes, the tick of each one (the index), then every keyframe's snapshot
+# zlib compressed together
+REPLAY_MAGIC = b'RL2R'
+REPLAY_VERSION = 2
+# the settings are doubles, a float32 boost regen rate would already make boost drift from the recorded match
+HEADER = struct.Struct('<4sHIHddddB')  # magic, version, seed, physics rate, total time, 3 limits, flags
+TICK_COUNT = struct.Struct('<I')
+BLOCK_SIZE = struct.Struct('<I')  # size of the compressed block that follows
+ELASTIC_COLLISIONS_FLAG = 1
+CONTINUOUS_COLLISIONS_FLAG = 2
+KEYFRAME_SECONDS = 5  # seconds of play between keyframes, seeking never simulates more than this
+
+
+class Replay(object):
+    def __init__(self, seed, physics_rate, total_time, thrust_speed_limit=15, boost_speed_limit=25,
+                 boost_regen_rate=0.05, elastic_collisions=True, inputs=None, keyframe_ticks=None, keyframes=None,
+                 continuous_collisions=False):
+        self.seed = seed
+        self.physics_rate = physics_rate
+        self.total_time = total_time
+        self.thrust_speed_limit = thrust_speed_limit
+        self.boost_speed_limit = boost_speed_limit
+        self.boost_regen_rate = boost_regen_rate
+        self.elastic_collisions = elastic_collisions
+        self.continuous_collisions = continuous_collisions
+        self.inputs = inputs if inputs is not None else array('H')  # fennec, octane, fennec, octane...
+        self.keyframe_interval = physics_rate * KEYFRAME_SECONDS  # ticks between keyframes
+        self.keyframe_ticks = keyframe_ticks if keyframe_ticks is not None else array('I')  # sorted
+        self.keyframes = keyframes if keyframes is not None else []  # snapshot before each of keyframe_ticks
+
+    @staticmethod
+    def from_match(match, seed):  # an empty replay with the settings of a match that is about to start
+        return Replay(seed, match.physics_rate, match.total_time, match.thrust_speed_limit,
+                      match.boost_speed_limit, match.boost_regen_rate, match.elastic_collisions,
+                      continuous_collisions=match.continuous_collisions)
+
+    def __len__(self):  # number of ticks
+        return len(self.inputs) // 2
+
+    def record(self, match, fennec_bits, octane_bits):  # called once per physics tick, before it is stepped
+        if match.ticks > 0 and match.ticks % self.keyframe_interval == 0:
+            self.add_keyframe(match)
+        self.inputs.append(fennec_bits)
+        self.inputs.append(octane_bits)
+
+    def record_snapshot(self, snapshot, fennec_bits, octane_bits):
+        # like record, for the next tick when it was stepped earlier, snapshot is pack_state from before it
+        tick = len(self)
+        if tick > 0 and tick % self.keyframe_interval == 0:
+            self.keyframe_ticks.append(tick)
+            self.keyframes.append(snapshot)
+        self.inputs.append(fennec_bits)
+        self.inputs.append(octane_bits)
+
+    def add_keyframe(self, match):
+        if self.keyframe_ticks and self.keyframe_ticks[-1] >= match.ticks:
+            return  # already have this one
+        self.keyframe_ticks.append(match.ticks)
+        self.keyframes.append(pack_state(match))
+
+    def tick_inputs(self, tick):
+        return self.inputs[2 * tick], self.inputs[2 * tick + 1]
+
+    def to_bytes(self):
+        flags = ELASTIC_COLLISIONS_FLAG if self.elastic_collisions else 0
+        if self.continuous_collisions:
+            flags |= CONTINUOUS_COLLISIONS_FLAG
+        header = HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, self.seed, self.physics_rate, self.total_time,
+                             self.thrust_speed_limit, self.boost_speed_limit, self.boost_regen_rate, flags)
+        inputs = array('H', self.inputs)
+        if struct.pack('=H', 1) != struct.pack('<H', 1):  # files are always little endian
+            inputs.byteswap()
+        compressed_inputs = zlib.compress(inputs.tobytes(), 9)
+        keyframe_ticks = array('I', self.keyframe_ticks)
+        if struct.pack('=H', 1) != struct.pack('<H', 1):
+            keyframe_ticks.byteswap()
+        compressed_keyframes = zlib.compress(b''.join(self.keyframes), 9)
+        return b''.join([header, TICK_COUNT.pack(len(self)), BLOCK_SIZE.pack(len(compressed_inputs)),
+                         compressed_inputs, TICK_COUNT.pack(len(self.keyframes)), keyframe_ticks.tobytes(),
+                         compressed_keyframes])
+
+    @staticmethod
+    def from_bytes(data):
+        magic, version, seed, physics_rate, total_time, thrust_speed_limit, boost_speed_limit, boost_regen_rate, \
+            flags = HEADER.unpack_from(data, 0)
+        if magic != REPLAY_MAGIC:
+            raise ValueError('not a replay file')
+        if version != REPLAY_VERSION:
+            raise ValueError(f'unsupported replay version {version}')
+        offset = HEADER.size
+        big_endian = struct.pack('=H', 1) != struct.pack('<H', 1)
+        ticks = TICK_COUNT.unpack_from(data, offset)[0]
+        offset += TICK_COUNT.size
+        inputs = array('H')
+        inputs_size = BLOCK_SIZE.unpack_from(data, offset)[0]
+        offset += BLOCK_SIZE.size
+        inputs.frombytes(zlib.decompress(data[offset:offset + inputs_size]))
+        offset += inputs_size
+        keyframe_count = TICK_COUNT.unpack_from(data, offset)[0]
+        offset += TICK_COUNT.size
+        keyframe_ticks = array('I')
+        keyframe_ticks.frombytes(data[offset:offset + 4 * keyframe_count])
+        offset += 4 * keyframe_count
+        snapshots = zlib.decompress(data[offset:])
+        if len(keyframe_ticks) != keyframe_count or len(snapshots) != keyframe_count * SNAPSHOT_SIZE:
+            raise ValueError('replay file is truncated')
+        keyframes = [snapshots[i * SNAPSHOT_SIZE:(i + 1) * SNAPSHOT_SIZE] for i in range(keyframe_count)]
+        if big_endian:
+            keyframe_ticks.byteswap()
+        if big_endian:
+            inputs.byteswap()
+        if len(inputs) != 2 * ticks:
+            raise ValueError('replay file is truncated')
+        return Replay(seed, physics_rate, total_time, thrust_speed_limit, boost_speed_limit, boost_regen_rate,
+                      bool(flags & ELASTIC_COLLISIONS_FLAG), inputs, keyframe_ticks, keyframes,
+                      bool(flags & CONTINUOUS_COLLISIONS_FLAG))
+
+    def save(self, path):
+        with open(path, 'wb') as replay_file:
+            replay_file.write(self.to_bytes())
+
+    @staticmethod
+    def load(path):
+        with open(path, 'rb') as replay_file:
+            return Replay.from_bytes(replay_file.read())
+
+    def new_match(self):  # a headless match with the same settings the replay was recorded with
+        match = HeadlessMatch(total_time=self.total_time, frame_rate=self.physics_rate)  # one frame per tick
+        match.thrust_speed_limit = self.thrust_speed_limit
+        match.boost_speed_limit = self.boost_speed_limit
+        match.boost_regen_rate = self.boost_regen_rate
+        match.elastic_collisions = self.elastic_collisions
+        match.continuous_collisions = self.continuous_collisions
+        match.reset()
+        return match
+
+    def play(self, match=None, until_tick=None):
+        # simulates the replay headlessly, from kickoff or from wherever match already is
+        # returns the match as it was after until_tick ticks (or at the end of the replay)
+        if match is None:
+            match = self.new_match()
+        end = len(self) if until_tick is None else min(until_tick, len(self))
+        inputs = self.inputs
+        from_bits = CarInput.from_bits
+        while match.ticks < end:
+            tick = match.ticks
+            match.step(from_bits(inputs[2 * tick]), from_bits(inputs[2 * tick + 1]))
+        return match
+
+    def seek(self, tick, match=None):
+        # returns a match as it was after tick ticks, by restoring the nearest keyframe before it and only
+        # simulating what's left, a match that is already between that keyframe and tick just carries on
+        tick = max(0, min(tick, len(self)))
+        if match is None:
+            match = self.new_match()
+        i = bisect_right(self.keyframe_ticks, tick) - 1  # last keyframe at or before tick
+        keyframe_tick = self.keyframe_ticks[i] if i >= 0 else 0
+        if not keyframe_tick <= match.ticks <= tick or match.is_over():
+            if i >= 0:
+                restore_state(match, self.keyframes[i])
+                match.winner = None  # keyframes are never taken after the match is won
+            else:
+                match.reset()
+        return self.play(match, tick)
+
+    def build_keyframes(self):  # simulates the whole replay once to add keyframes, for replays recorded without
+        self.keyframe_ticks = array('I')
+        self.keyframes = []
+        match = self.new_match()
+        for tick in range(self.keyframe_interval, len(self), self.keyframe_interval):
+            self.play(match, tick)
+            self.add_keyframe(match)
+
+
+if __name__ == '__main__':
+    import sys
+    import time
+
+    for path in sys.argv[1:]:
+        replay = Replay.load(path)
+        start = time.perf_counter()
+        replayed = replay.play()
+        seconds = time.perf_counter() - start
+        game_seconds = len(replay) / replay.physics_rate
+        print(f'{path}: seed {replay.seed}, {len(replay)} ticks at {replay.physics_rate} Hz, '
+              f'blue {replayed.fennec.score} - orange {replayed.octane.score}, touches {replayed.touches}, '
+              f'{len(replay.keyframes)} keyframes, replayed {game_seconds:.1f}s of play in {seconds:.2f}s')
@@ -0,0 +1,26 @@
+import heapq
+
+
+class TickScheduler(object):
+    # calls things at a physics tick, kept in a min-heap by tick so only events that are due are ever looked at
+    # counting in ticks instead of seconds means a fast-forwarded or replayed match does everything at the same tick
+    def __init__(self):
+        self.events = []  # heap of (tick, number, action, args)
+        self.scheduled = 0  # events ever added, events due at the same tick run in the order they were added
+
+    def at(self, tick, action, *args):
+        heapq.heappush(self.events, (tick, self.scheduled, action, args))
+        self.scheduled += 1
+
+    def run_due(self, tick):  # calls everything due at tick or before, returns how many ran
+        events = self.events
+        ran = 0
+        while events and events[0][0] <= tick:
+            tick_due, number, action, args = heapq.heappop(events)
+            action(*args)
+            ran += 1
+        return ran
+
+    def clear(self):
+        self.events = []
+
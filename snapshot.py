@@ -0,0 +1,103 @@
+from array import array
+import struct
+
+
+# the whole simulated state of a match packed into a fixed size record, taken between physics ticks
+# anything that only depends on this (hitboxes) is rebuilt on restore instead of stored
+MATCH_STATE = struct.Struct('<Iib3H2I')  # ticks, overtime start tick, status, 3 cooldowns, touches blue, orange
+OBJECT_STATE = struct.Struct('<10d?')  # x, y, vel x, vel y, 6 forces, grounded
+CAR_STATE = struct.Struct('<dHbBB')  # boost left, score, jumps remaining, facing right, active images
+# all of it as one struct, so a snapshot is a single pack or unpack: the match, ball, fennec, octane, fennec, octane
+STATE = struct.Struct('<' + MATCH_STATE.format[1:] + 3 * OBJECT_STATE.format[1:] + 2 * CAR_STATE.format[1:])
+SNAPSHOT_SIZE = STATE.size
+MATCH_FIELDS = 8
+OBJECT_FIELDS = 11
+CAR_FIELDS = 5
+
+
+def cooldown_count(ticks, cooldown):
+    # a cooldown is kept as the tick it ends, it's packed as the ticks since the hit plus one (0 when not cooling)
+    if ticks >= cooldown[0]:
+        return 0
+    return ticks - cooldown[0] + cooldown[1] + 1
+
+
+def state_values(match):  # everything STATE packs, in order
+    ticks = match.ticks
+    values = [ticks, match.overtime_start_tick, match.status]
+    values += [cooldown_count(ticks, cooldown) for cooldown in match.all_cooldowns]
+    values += match.touches
+    for obj in match.game_objects:
+        forces = obj.forces
+        values += (obj.x, obj.y, obj.vel_x, obj.vel_y, forces.gravity, forces.drive_left, forces.drive_right,
+                   forces.boost, forces.boost_up, forces.friction, obj.is_grounded)
+    for car in match.cars:
+        images_active = car.images_active
+        values += (car.boost_left, car.score, car.jumps_remaining, car.facing == 'right',
+                   images_active[0] | (images_active[1] << 1) | (images_active[2] << 2))
+    return values
+
+
+def pack_state(match):  # returns SNAPSHOT_SIZE bytes
+    return STATE.pack(*state_values(match))
+
+
+def pack_state_into(match, buffer, offset=0):  # writes the snapshot into a preallocated buffer, like a SnapshotRing
+    STATE.pack_into(buffer, offset, *state_values(match))
+
+
+def restore_state(match, data, offset=0):  # puts a match back exactly how it was when pack_state was called
+    values = STATE.unpack_from(data, offset)
+    match.ticks, match.overtime_start_tick, match.status = values[0:3]
+    for cooldown, count in zip(match.all_cooldowns, values[3:6]):
+        cooldown[0] = match.ticks + cooldown[1] - count + 1 if count else 0
+    match.touches = list(values[6:8])
+    i = MATCH_FIELDS
+    for obj in match.game_objects:
+        forces = obj.forces
+        (obj.x, obj.y, obj.vel_x, obj.vel_y, forces.gravity, forces.drive_left, forces.drive_right, forces.boost,
+         forces.boost_up, forces.friction, obj.is_grounded) = values[i:i + OBJECT_FIELDS]
+        i += OBJECT_FIELDS
+        obj.update_hitbox()
+        obj.previous_x = obj.x  # drawn where it is, not sliding from wherever it was before the restore
+        obj.previous_y = obj.y
+        obj.draw_x = obj.x
+        obj.draw_y = obj.y
+    for car in match.cars:
+        car.boost_left, car.score, car.jumps_remaining, facing_right, images_active = values[i:i + CAR_FIELDS]
+        i += CAR_FIELDS
+        car.facing = 'right' if facing_right else 'left'
+        car.images_active = [bool(images_active & 1), bool(images_active & 2), bool(images_active & 4)]
+    return match
+
+
+class SnapshotRing(object):
+    # the snapshots of the last capacity ticks in one preallocated buffer, saving and restoring never allocates one
+    # a tick's slot is tick % capacity, so saving a tick overwrites the one capacity ticks before it
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.buffer = bytearray(capacity * SNAPSHOT_SIZE)
+        self.ticks = array('q', [-1] * capacity)  # which tick each slot holds, -1 for none
+
+    def save(self, match):  # the state before match.ticks is stepped
+        slot = match.ticks % self.capacity
+        pack_state_into(match, self.buffer, slot * SNAPSHOT_SIZE)
+        self.ticks[slot] = match.ticks
+
+    def __contains__(self, tick):
+        return tick >= 0 and self.ticks[tick % self.capacity] == tick
+
+    def restore(self, match, tick):
+        if tick not in self:
+            raise KeyError(f'no snapshot of tick {tick}')
+        return restore_state(match, self.buffer, (tick % self.capacity) * SNAPSHOT_SIZE)
+
+    def get(self, tick):  # a copy of the tick's snapshot, for keeping it longer than the ring does
+        if tick not in self:
+            raise KeyError(f'no snapshot of tick {tick}')
+        offset = (tick % self.capacity) * SNAPSHOT_SIZE
+        return bytes(self.buffer[offset:offset + SNAPSHOT_SIZE])
+
+    def clear(self):
+        for slot in range(self.capacity):
+            self.ticks[slot] = -1
@@ -0,0 +1,56 @@
+import random
+
+import numpy as np
+import pytest
+
+from batch import BatchArena
+from engine import CarInput, HeadlessMatch
+
+
+def batch_state(arena, i):
+    return [arena.ball_x[i], arena.ball_y[i], arena.ball_vel_x[i], arena.ball_vel_y[i],
+            *arena.car_x[i], *arena.car_y[i], *arena.car_vel_x[i], *arena.car_vel_y[i], *arena.boost_left[i]]
+
+
+def match_state(match):
+    cars = match.cars
+    return [match.ball.x, match.ball.y, match.ball.vel_x, match.ball.vel_y,
+            *[car.x for car in cars], *[car.y for car in cars], *[car.vel_x for car in cars],
+            *[car.vel_y for car in cars], *[car.boost_left for car in cars]]
+
+
+def test_batch_arena_plays_like_headless_match():
+    # every match of the batch gets its own random inputs and a HeadlessMatch stepped with the same ones
+    n = 4
+    rng = random.Random(5)
+    arena = BatchArena(n, total_time=20)
+    matches = [HeadlessMatch(total_time=20, frame_rate=30) for i in range(n)]
+    for match in matches:
+        match.reset()
+    for tick in range(1500):
+        if all(match.is_over() for match in matches):
+            break
+        bits = np.zeros((n, 2), dtype=np.int32)
+        for i, match in enumerate(matches):
+            for car_index, car in enumerate(match.cars):
+                if rng.random() < 0.5:  # mostly chase the ball, so there are hits and goals
+                    bits[i, car_index] = rng.choice([0, 1, 2, 4, 5, 6, 8, 16, 17, 18, 24, 21])
+                else:
+                    bits[i, car_index] = 1 if match.ball.x < car.x else 2
+            if not match.is_over():
+                match.step(CarInput.from_bits(int(bits[i, 0])), CarInput.from_bits(int(bits[i, 1])))
+        arena.step(bits)
+        for i, match in enumerate(matches):
+            if match.is_over():
+                continue
+            assert batch_state(arena, i) == pytest.approx(match_state(match), abs=1e-6), f'match {i}, tick {tick}'
+            assert arena.status[i] == match.status
+    for i, match in enumerate(matches):
+        assert list(arena.score[i]) == [match.fennec.score, match.octane.score]
+        assert arena.winner[i] == {'blue': 0, 'orange': 1}[match.winner]
+    assert arena.touches.sum() > 0 and arena.score.sum() > 0
+
+
+def test_batch_arena_only_runs_at_the_base_rate():
+    with pytest.raises(ValueError):
+        BatchArena(2, frame_rate=120)
@@ -0,0 +1,78 @@
+import random
+
+from engine import CarInput, HeadlessMatch, make_ball, make_fennec, make_octane
+
+
+def crowded_match(broad_phase_min_objects):
+    # 3 cars a team and 2 balls, every car starts somewhere else
+    extra_cars = []
+    for x, team in ((420, 0), (620, 0), (970, 1), (770, 1)):
+        car = make_fennec() if team == 0 else make_octane()
+        car.initial_x = x
+        extra_cars.append((car, team))
+    extra_ball = make_ball()
+    extra_ball.initial_x = 400
+    match = HeadlessMatch(total_time=30, frame_rate=30, extra_cars=extra_cars, extra_balls=[extra_ball])
+    match.broad_phase_min_objects = broad_phase_min_objects
+    match.reset()
+    return match
+
+
+def chase_inputs(match, rng):
+    # every car mostly drives at the nearest ball, so they pile up on it and on each other
+    inputs = []
+    for car in match.cars:
+        ball = min(match.balls, key=lambda ball: abs(ball.x - car.x))
+        bits = 1 if ball.x < car.x else 2
+        if rng.random() < 0.3:
+            bits = rng.choice([0, 4, 8, 16, bits | 4, bits | 16])
+        inputs.append(CarInput.from_bits(bits))
+    return inputs
+
+
+def state_of(match):
+    return [(obj.x, obj.y, obj.vel_x, obj.vel_y) for obj in match.game_objects] + \
+        [(car.score, car.boost_left) for car in match.cars] + [match.touches, match.status]
+
+
+def touching(box1, box2):
+    return box1[0] <= box2[0] + box2[2] and box2[0] <= box1[0] + box1[2] and \
+        box1[1] <= box2[1] + box2[3] and box2[1] <= box1[1] + box1[3]
+
+
+def test_crowded_match_has_every_pair_and_team():
+    match = crowded_match(0)
+    assert len(match.contact_list) == 6 * 5 // 2 + 2 * 6 + 1
+    assert match.teams == [0, 1, 0, 0, 1, 1]
+    assert [car.facing for car in match.cars] == ['right', 'left', 'right', 'right', 'left', 'left']
+    assert len(match.all_cooldowns) == len(match.contact_list)
+
+
+def test_sweep_finds_the_same_pairs_as_brute_force():
+    match = crowded_match(0)
+    rng = random.Random(3)
+    touches = 0
+    for tick in range(900):
+        contacts, structure_pairs = match.candidate_pairs()
+        assert [pair.rank for pair in contacts] == sorted(pair.rank for pair in contacts)
+        swept = set(pair.rank for pair in contacts if touching(pair.obj1.hitbox, pair.obj2.hitbox))
+        brute = set(pair.rank for pair in match.contact_list if touching(pair.obj1.hitbox, pair.obj2.hitbox))
+        assert swept == brute, f'tick {tick}'
+        touches += len(brute)
+        match.step(*chase_inputs(match, rng))
+    assert touches > 0
+
+
+def test_sweep_plays_like_brute_force():
+    # a crowded match must not notice whether the broad phase ran, tick by tick
+    swept = crowded_match(0)
+    brute = crowded_match(10 ** 6)
+    swept_rng = random.Random(7)
+    brute_rng = random.Random(7)
+    events = []
+    for tick in range(900):
+        swept_events = swept.step(*chase_inputs(swept, swept_rng))
+        assert brute.step(*chase_inputs(brute, brute_rng)) == swept_events, f'tick {tick}'
+        assert state_of(swept) == state_of(brute), f'tick {tick}'
+        events += swept_events
+    assert any(event.startswith('touch') for event in events)
@@ -0,0 +1,102 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from collisions import collision_set_new_velocities, collision_velocities, collision_velocities_arrays
+from collisions import restitution_between
+from engine import HeadlessMatch
+
+MASSES = [(1, 3), (3, 1), (3, 3), (1, 1), (0.5, 40)]  # ball and car, car and ball, two cars...
+VELOCITIES = [(0, 0), (12.5, -3), (-25, 0), (7, 7), (0, -18.25), (1e-3, 30)]
+RESTITUTIONS = [1.0, 0.8, 0.1, 0.0]
+
+
+def solved_velocities(v1, v2, m1, m2, restitution):
+    # how the response used to be worked out, with np.linalg.solve on the two equations
+    matrix = np.array([[m1, m2], [1, -1]])
+    constants = np.array([m1 * v1 + m2 * v2, restitution * (v2 - v1)])
+    return tuple(np.linalg.solve(matrix, constants))
+
+
+@pytest.mark.parametrize('m1, m2', MASSES)
+@pytest.mark.parametrize('v1, v2', VELOCITIES)
+@pytest.mark.parametrize('restitution', RESTITUTIONS)
+def test_closed_form_matches_solving_the_equations(m1, m2, v1, v2, restitution):
+    vf1, vf2 = collision_velocities(v1, v2, m1, m2, restitution)
+    assert (vf1, vf2) == pytest.approx(solved_velocities(v1, v2, m1, m2, restitution), rel=1e-12, abs=1e-12)
+    assert m1 * vf1 + m2 * vf2 == pytest.approx(m1 * v1 + m2 * v2, rel=1e-12, abs=1e-12)  # momentum
+    if restitution == 1.0:  # elastic, no kinetic energy is lost
+        assert m1 * vf1 ** 2 + m2 * vf2 ** 2 == pytest.approx(m1 * v1 ** 2 + m2 * v2 ** 2, rel=1e-12, abs=1e-12)
+
+
+@pytest.mark.parametrize('m1, m2', MASSES)
+@pytest.mark.parametrize('restitution', RESTITUTIONS)
+def test_objects_and_arrays_match_the_closed_form(m1, m2, restitution):
+    for (vx1, vx2), (vy1, vy2) in zip(VELOCITIES, VELOCITIES[1:] + VELOCITIES[:1]):
+        obj1 = SimpleNamespace(mass=m1, vel_x=vx1, vel_y=vy1)
+        obj2 = SimpleNamespace(mass=m2, vel_x=vx2, vel_y=vy2)
+        collision_set_new_velocities(obj1, obj2, restitution)
+        assert (obj1.vel_x, obj2.vel_x) == pytest.approx(collision_velocities(vx1, vx2, m1, m2, restitution))
+        assert (obj1.vel_y, obj2.vel_y) == pytest.approx(collision_velocities(vy1, vy2, m1, m2, restitution))
+
+    v1 = np.array([v[0] for v in VELOCITIES])
+    v2 = np.array([v[1] for v in VELOCITIES])
+    touching = np.arange(len(VELOCITIES)) % 2 == 0
+    new_v1, new_v2 = collision_velocities_arrays(v1, v2, m1, m2, restitution, touching)
+    for i in range(len(VELOCITIES)):
+        expected = collision_velocities(v1[i], v2[i], m1, m2, restitution) if touching[i] else (v1[i], v2[i])
+        assert (new_v1[i], new_v2[i]) == pytest.approx(expected)
+
+
+def test_the_bouncier_object_decides_restitution():
+    ball = SimpleNamespace(elasticity=0.8)
+    car = SimpleNamespace(elasticity=0.1)
+    assert restitution_between(ball, car) == restitution_between(car, ball) == 0.8
+    assert restitution_between(car, car) == 0.1
+
+
+def fast_ball_at_fennec(continuous_collisions, cooling_down):
+    # the ball comes at fennec along the ground 250 a tick, more than fennec and the ball are wide together,
+    # so one tick it is in front of fennec and the next one already behind it, in the goal
+    match = HeadlessMatch(frame_rate=30)
+    match.reset()
+    match.continuous_collisions = continuous_collisions
+    ball = match.ball
+    ball.x, ball.y, ball.vel_x, ball.vel_y = 570, 650, -250, 0
+    ball.update_hitbox()
+    if cooling_down:  # just hit each other, a cooldown must not let them pass through each other
+        match.contact_pairs[(id(ball), id(match.fennec))].cooldown[0] = match.ticks + 10
+    events = []
+    for tick in range(4):  # goals count the tick after the ball is in
+        events += match.step()
+    return match, events
+
+
+def test_fast_ball_tunnels_without_continuous_collisions():
+    match, events = fast_ball_at_fennec(False, False)
+    assert events == ['goal orange']
+
+
+@pytest.mark.parametrize('cooling_down', [False, True])
+def test_fast_ball_hits_the_car_it_would_pass_through(cooling_down):
+    match, events = fast_ball_at_fennec(True, cooling_down)
+    assert events == ['touch blue']
+    assert match.ball.vel_x > 0
+    assert match.ball.hitbox[0] > match.fennec.hitbox[0] + match.fennec.hitbox[2]
+
+
+def test_every_hit_of_a_tick_is_swept():
+    # the ball bounces off fennec and would pass through octane, right behind it, in the same tick
+    match = HeadlessMatch(frame_rate=30)
+    match.reset()
+    match.continuous_collisions = True
+    match.octane.x = 420
+    match.octane.update_hitbox()
+    ball = match.ball
+    ball.x, ball.y, ball.vel_x, ball.vel_y = 320, 650, -400, 0
+    ball.update_hitbox()
+    events = match.step()
+    assert sorted(events) == ['touch blue', 'touch orange']
+    assert match.fennec.hitbox[0] + match.fennec.hitbox[2] <= ball.hitbox[0]
+    assert ball.hitbox[0] + ball.hitbox[2] <= match.octane.hitbox[0]
@@ -0,0 +1,46 @@
+import random
+
+import numpy as np
+import pytest
+
+from env import BatchMatchEnv, MatchEnv
+
+
+def play_episode(env, seed, ticks=600):
+    # the same actions every time, returns every observation and reward on the way
+    actions = random.Random(0)
+    observations = [env.reset(seed).copy()]
+    rewards = []
+    for tick in range(ticks):
+        observation, reward, done, info = env.step(actions.randrange(32))
+        observations.append(observation.copy())
+        rewards.append(reward)
+        if done:
+            break
+    return np.array(observations), rewards
+
+
+@pytest.mark.parametrize('opponent', [None, 'chase'])
+def test_match_env_is_deterministic(opponent):
+    env = MatchEnv(opponent=opponent)
+    first = play_episode(env, None)
+    again = play_episode(env, None)
+    assert np.array_equal(first[0], again[0]) and first[1] == again[1]
+
+
+def test_seed_reaches_the_bot_opponent():
+    env = MatchEnv(opponent='random', team='orange')
+    first = play_episode(env, 3)
+    assert np.array_equal(play_episode(MatchEnv(opponent='random', team='orange'), 3)[0], first[0])
+    assert not np.array_equal(play_episode(env, 4)[0], first[0])
+    assert np.array_equal(play_episode(env, 3)[0], first[0])
+
+
+def test_unknown_bot_opponent():
+    with pytest.raises(KeyError):
+        MatchEnv(opponent='nobody')
+
+
+def test_batch_env_only_runs_at_the_base_rate():
+    with pytest.raises(ValueError):
+        BatchMatchEnv(2, physics_rate=60)
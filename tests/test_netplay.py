@@ -0,0 +1,18 @@
+import pytest
+
+from netplay import loopback
+from snapshot import pack_state
+
+
+@pytest.mark.parametrize('latency, jitter, loss', [(0.05, 0.0, 0.05), (0.1, 0.03, 0.2)])
+def test_peers_agree_over_a_bad_connection(latency, jitter, loss):
+    peers, winners, elapsed = loopback(ticks=5000, latency=latency, jitter=jitter, loss=loss, seed=3, total_time=20)
+    try:
+        assert winners[0] is not None and winners[0] == winners[1]
+        assert all(peer.in_sync() for peer in peers)
+        assert pack_state(peers[0].match) == pack_state(peers[1].match)
+        assert sum(peer.rollbacks for peer in peers) > 0  # predictions were wrong and rolled back
+        assert sum(peer.transport.dropped for peer in peers) > 0
+    finally:
+        for peer in peers:
+            peer.close()
@@ -0,0 +1,66 @@
+import random
+
+from engine import CarInput, HeadlessMatch
+from replay import Replay
+from snapshot import pack_state
+
+
+def mashing_policy(seed, replay):
+    # holds a random mix of controls for a few ticks at a time, and records what it chose
+    rng = random.Random(seed)
+    held = [0, 0]
+    left = [0, 0]
+
+    def policy(match):
+        bits = []
+        for car in range(2):
+            if left[car] == 0:
+                held[car] = rng.randrange(32)
+                left[car] = rng.randrange(1, 30)
+            left[car] -= 1
+            bits.append(held[car])
+        replay.record(match, bits[0], bits[1])
+        return CarInput.from_bits(bits[0]), CarInput.from_bits(bits[1])
+    return policy
+
+
+def state_of(match):
+    objects = [(obj.x, obj.y, obj.vel_x, obj.vel_y) for obj in match.game_objects]
+    cars = [(car.score, car.boost_left) for car in match.cars]
+    return objects, cars, match.ticks, match.touches, match.winner
+
+
+def play_recorded(seed, total_time=20, physics_rate=120):
+    # a recorded match with random controls, returns (match, replay)
+    match = HeadlessMatch(total_time=total_time, frame_rate=physics_rate)
+    match.reset()
+    replay = Replay.from_match(match, seed)
+    match.run(mashing_policy(seed, replay), max_ticks=(total_time + 30) * physics_rate)  # overtime can't go on forever
+    return match, replay
+
+
+def test_replay_reproduces_the_match():
+    match, replay = play_recorded(seed=3)
+    played = Replay.from_bytes(replay.to_bytes()).play()
+    assert len(replay) == match.ticks
+    assert state_of(played) == state_of(match)
+
+
+def test_replay_keeps_the_physics_settings():
+    match = HeadlessMatch(total_time=30, frame_rate=60)
+    match.boost_regen_rate = 0.07  # not exact as a float32
+    match.elastic_collisions = False
+    loaded = Replay.from_bytes(Replay.from_match(match, 11).to_bytes())
+    assert (loaded.seed, loaded.physics_rate, loaded.total_time) == (11, 60, 30)
+    assert loaded.boost_regen_rate == 0.07
+    assert not loaded.elastic_collisions
+
+
+def test_seek_matches_playing_from_kickoff():
+    match, replay = play_recorded(seed=4)
+    loaded = Replay.from_bytes(replay.to_bytes())
+    assert len(loaded.keyframe_ticks) == (len(replay) - 1) // replay.keyframe_interval
+    for tick in (0, 5, loaded.keyframe_ticks[0], loaded.keyframe_ticks[-1] + 7, len(loaded)):
+        assert pack_state(loaded.seek(tick)) == pack_state(loaded.play(until_tick=tick))
+    seeking = loaded.seek(len(loaded) - 1)
+    assert pack_state(loaded.seek(100, seeking)) == pack_state(loaded.play(until_tick=100))  # scrubbing back
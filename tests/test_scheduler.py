@@ -0,0 +1,53 @@
+from scheduler import TickScheduler
+
+
+def test_events_run_in_tick_order_and_ties_in_the_order_added():
+    scheduler = TickScheduler()
+    ran = []
+    scheduler.at(5, ran.append, 'five')
+    scheduler.at(2, ran.append, 'two')
+    scheduler.at(5, ran.append, 'five again')
+    scheduler.at(3, ran.append, 'three')
+    assert scheduler.run_due(1) == 0
+    assert scheduler.run_due(4) == 2
+    assert ran == ['two', 'three']
+    assert scheduler.run_due(5) == 2
+    assert ran == ['two', 'three', 'five', 'five again']
+    assert scheduler.run_due(100) == 0
+
+
+def test_late_events_run_on_the_next_call():
+    scheduler = TickScheduler()
+    ran = []
+    scheduler.run_due(10)
+    scheduler.at(3, ran.append, 'missed')  # already in the past, like a chat that expires during a long frame
+    assert scheduler.run_due(11) == 1
+    assert ran == ['missed']
+
+
+def test_an_event_can_schedule_another_one():
+    scheduler = TickScheduler()
+    ran = []
+
+    def again(tick):
+        ran.append(tick)
+        if tick < 4:
+            scheduler.at(tick + 1, again, tick + 1)
+    scheduler.at(1, again, 1)
+    assert scheduler.run_due(3) == 3  # the ones added while running still run if they are due
+    assert ran == [1, 2, 3]
+    assert scheduler.run_due(10) == 1
+    assert ran == [1, 2, 3, 4]
+
+
+def test_clear_cancels_everything_pending():
+    scheduler = TickScheduler()
+    ran = []
+    scheduler.at(1, ran.append, 'one')
+    scheduler.at(2, ran.append, 'two')
+    scheduler.run_due(1)
+    scheduler.clear()
+    assert scheduler.run_due(100) == 0
+    assert ran == ['one']
+    scheduler.at(101, ran.append, 'after')  # still usable after clearing
+    assert scheduler.run_due(101) == 1
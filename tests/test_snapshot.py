@@ -0,0 +1,47 @@
+import pytest
+
+from bots import make_bot
+from engine import HeadlessMatch
+from snapshot import SnapshotRing, pack_state, restore_state
+
+
+def random_match(seed, ticks, ring=None):
+    # steps a match with random inputs, returns (match, inputs of each tick, pack_state before each tick)
+    match = HeadlessMatch(total_time=45, frame_rate=120)
+    match.reset()
+    blue = make_bot('random', seed)
+    orange = make_bot('random', seed + 1)
+    inputs = []
+    states = []
+    for tick in range(ticks):
+        if ring is not None:
+            ring.save(match)
+        states.append(pack_state(match))
+        inputs.append((blue.act(match, 0), orange.act(match, 1)))
+        match.step(*inputs[-1])
+    return match, inputs, states
+
+
+def test_restore_state_round_trips():
+    match, inputs, states = random_match(seed=1, ticks=600)
+    final = pack_state(match)
+    restore_state(match, states[200])
+    assert pack_state(match) == states[200]
+    for tick in range(200, 600):  # the same inputs from there end up in the same place
+        match.step(*inputs[tick])
+    assert pack_state(match) == final
+
+
+def test_snapshot_ring_keeps_the_last_capacity_ticks():
+    ring = SnapshotRing(16)
+    match, inputs, states = random_match(seed=2, ticks=100, ring=ring)
+    assert 99 in ring and 84 in ring
+    assert 83 not in ring
+    for tick in (84, 90, 99):
+        assert ring.get(tick) == states[tick]
+        ring.restore(match, tick)
+        assert pack_state(match) == states[tick]
+    with pytest.raises(KeyError):
+        ring.restore(match, 83)
+    ring.clear()
+    assert 99 not in ring
@@ -0,0 +1,39 @@
+from text import TextCache
+
+
+class CountingFont(object):  # stands in for a pygame font, renders to a tuple and counts the calls
+    def __init__(self):
+        self.renders = 0
+
+    def render(self, text, antialias, color):
+        self.renders += 1
+        return (text, antialias, tuple(color), self.renders)
+
+
+def test_the_same_text_is_only_rendered_once():
+    font = CountingFont()
+    cache = TextCache()
+    first = cache.render(font, '1:00', (255, 255, 255))
+    assert cache.render(font, '1:00', [255, 255, 255]) is first  # a list color is the same key as a tuple
+    assert font.renders == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+    cache.render(font, '1:00', (0, 0, 0))
+    cache.render(font, '1:00', (255, 255, 255), antialias=False)
+    cache.render(CountingFont(), '1:00', (255, 255, 255))
+    assert cache.misses == 4  # every other font, color or antialiasing is rendered on its own
+
+
+def test_the_least_recently_used_text_is_forgotten():
+    font = CountingFont()
+    cache = TextCache(max_size=3)
+    for text in ('a', 'b', 'c'):
+        cache.render(font, text, (1, 2, 3))
+    cache.render(font, 'a', (1, 2, 3))  # a is used again, so b is now the oldest
+    cache.render(font, 'd', (1, 2, 3))
+    assert len(cache.surfaces) == 3
+    assert [key[1] for key in cache.surfaces] == ['c', 'a', 'd']
+    renders = font.renders
+    cache.render(font, 'b', (1, 2, 3))
+    assert font.renders == renders + 1  # b had to be rendered again
+    cache.clear()
+    assert not cache.surfaces
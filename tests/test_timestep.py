@@ -0,0 +1,38 @@
+import pytest
+
+from timestep import FixedTimestep
+
+
+def test_frames_become_whole_ticks():
+    timestep = FixedTimestep(4, max_frame_time=1)  # a tick is 0.25 s, every time below is exact in binary
+    assert timestep.advance(0.5) == 2
+    assert timestep.alpha() == 0
+    assert timestep.advance(0.125) == 0
+    assert timestep.alpha() == 0.5  # halfway to the next tick
+    assert timestep.advance(0.125) == 1  # the leftover half tick is kept
+    assert timestep.alpha() == 0
+
+
+def test_a_long_frame_only_catches_up_max_frame_time():
+    timestep = FixedTimestep(8, max_frame_time=0.25)
+    assert timestep.advance(3.0) == 2  # a three second stall runs a quarter second of ticks, not 24
+    assert timestep.alpha() == 0
+    assert timestep.advance(0.0625) == 0
+    assert timestep.alpha() == 0.5
+
+
+def test_reset_forgets_unsimulated_time():
+    timestep = FixedTimestep(120)
+    timestep.advance(1 / 200)
+    assert 0 < timestep.alpha() < 1
+    timestep.reset()
+    assert timestep.alpha() == 0
+    assert timestep.advance(0) == 0
+
+
+@pytest.mark.parametrize('tick_rate', [30, 60, 120, 144])
+def test_one_second_of_frames_is_one_second_of_ticks(tick_rate):
+    timestep = FixedTimestep(tick_rate)
+    ticks = sum(timestep.advance(1 / 60) for frame in range(60))
+    assert ticks in (tick_rate - 1, tick_rate)  # float rounding can leave the last one in the accumulator
+    assert 0 <= timestep.alpha() < 1
@@ -0,0 +1,25 @@
+import pytest
+
+import tournament
+from engine import HeadlessMatch
+
+
+def test_overtime_limit_counts_from_the_start_of_overtime():
+    # nobody touches the controls, so it's 0-0 and overtime never ends by itself
+    match = HeadlessMatch(total_time=2, frame_rate=30)
+    assert match.run(max_overtime_ticks=45) is None
+    assert match.status == match.OVERTIME
+    assert match.overtime_start_tick > 2 * 30  # the ball had to land after time ran out first
+    assert match.ticks - match.overtime_start_tick == 45
+
+
+def test_worker_limits_only_overtime():
+    tournament.init_worker(2, 30, 1.5)
+    blue, orange, winner, blue_score, orange_score, ticks = tournament.play_match(('idle', 'idle', 0))
+    assert winner is None and blue_score == orange_score == 0
+    assert ticks == tournament.worker_match.overtime_start_tick + 45
+
+
+def test_bots_are_entered_once():
+    with pytest.raises(SystemExit):
+        tournament.main(['chase', 'random', 'chase'])
@@ -0,0 +1,49 @@
+from collections import OrderedDict
+import pygame
+
+
+fonts = {}  # (name, size, bold, italic): font, SysFont searches the system fonts so each one is only made once
+
+
+def get_font(name, size, bold=False, italic=False):
+    key = (name, size, bold, italic)
+    font = fonts.get(key)
+    if font is None:
+        if not pygame.font.get_init():
+            pygame.font.init()
+        font = pygame.font.SysFont(name, size, bold, italic)
+        fonts[key] = font
+    return font
+
+
+class TextCache(object):
+    # keeps the most recently rendered text surfaces so text that didn't change isn't rendered again
+    def __init__(self, max_size=256):
+        self.max_size = max_size
+        self.surfaces = OrderedDict()  # (font, text, color, antialias): surface, oldest first
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, color, antialias=True):
+        key = (font, text, tuple(color), antialias)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)  # most recently used goes last
+            self.hits += 1
+            return surface
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_size:
+            self.surfaces.popitem(last=False)  # forget the least recently used surface
+        return surface
+
+    def clear(self):
+        self.surfaces.clear()
+
+
+text_cache = TextCache()
+
+
+def render_text(font, text, color, antialias=True):  # font.render, but from the shared cache
+    return text_cache.render(font, text, color, antialias)
@@ -0,0 +1,19 @@
+class FixedTimestep(object):
+    # turns however long a drawn frame took into a whole number of fixed-length physics ticks
+    def __init__(self, tick_rate, max_frame_time=0.25):
+        self.tick_rate = tick_rate  # physics ticks per second
+        self.tick_time = 1 / tick_rate  # seconds per physics tick
+        self.max_frame_time = max_frame_time  # a long stall only catches up this much, instead of freezing
+        self.accumulator = 0.0  # time that hasn't been simulated yet
+
+    def reset(self):
+        self.accumulator = 0.0
+
+    def advance(self, seconds):  # returns how many physics ticks to run for a frame that took this long
+        self.accumulator += min(seconds, self.max_frame_time)
+        ticks = int(self.accumulator / self.tick_time)
+        self.accumulator -= ticks * self.tick_time
+        return ticks
+
+    def alpha(self):  # how far between the last tick and the next one the drawn frame is, from 0 to 1
+        return self.accumulator / self.tick_time
@@ -0,0 +1,151 @@
+from bots import BOTS, make_bot
+from concurrent.futures import ProcessPoolExecutor
+from engine import *
+import argparse
+import itertools
+import os
+import time
+
+
+# runs scripted bots against each other on every core, python tournament.py --help for the options
+# each worker process keeps one HeadlessMatch and resets it for every match it plays
+
+worker_match = None  # the worker process's match, made once by init_worker
+worker_max_overtime_ticks = None
+
+
+def init_worker(total_time, physics_rate, max_overtime):
+    global worker_match, worker_max_overtime_ticks
+    worker_match = HeadlessMatch(total_time=total_time, frame_rate=physics_rate)
+    worker_max_overtime_ticks = None
+    if max_overtime is not None:  # nobody scoring in overtime would go on forever
+        worker_max_overtime_ticks = round(max_overtime * physics_rate)
+
+
+def play_match(job):
+    # job is (blue bot, orange bot, seed), returns (blue bot, orange bot, winner, blue score, orange score, ticks)
+    # winner is 'blue', 'orange' or None if overtime ran past max_overtime
+    blue_name, orange_name, seed = job
+    blue = make_bot(blue_name, seed)
+    orange = make_bot(orange_name, seed + 1)
+    match = worker_match
+    # run plays regulation, time running out with the ball in the air, overtime and game over like Game.main
+    winner = match.run(lambda m: (blue.act(m, 0), orange.act(m, 1)), max_overtime_ticks=worker_max_overtime_ticks)
+    return blue_name, orange_name, winner, match.fennec.score, match.octane.score, match.ticks
+
+
+class Standings(object):
+    def __init__(self, bots):
+        self.results = {bot: {'wins': 0, 'losses': 0, 'draws': 0, 'goals for': 0, 'goals against': 0}
+                        for bot in bots}
+        self.matches = 0
+        self.ticks = 0
+
+    def add(self, result):
+        blue, orange, winner, blue_score, orange_score, ticks = result
+        self.matches += 1
+        self.ticks += ticks
+        self.results[blue]['goals for'] += blue_score
+        self.results[blue]['goals against'] += orange_score
+        self.results[orange]['goals for'] += orange_score
+        self.results[orange]['goals against'] += blue_score
+        if winner is None:
+            self.results[blue]['draws'] += 1
+            self.results[orange]['draws'] += 1
+        else:
+            winning, losing = (blue, orange) if winner == 'blue' else (orange, blue)
+            self.results[winning]['wins'] += 1
+            self.results[losing]['losses'] += 1
+
+    def win_rate(self, bot):
+        result = self.results[bot]
+        played = result['wins'] + result['losses'] + result['draws']
+        return (result['wins'] + result['draws'] / 2) / played if played else 0.0
+
+    def table(self):
+        lines = [f'{"bot":<10} {"win rate":>8} {"W":>5} {"L":>5} {"D":>5} {"GF":>6} {"GA":>6}']
+        for bot in sorted(self.results, key=self.win_rate, reverse=True):
+            result = self.results[bot]
+            lines.append(f'{bot:<10} {self.win_rate(bot):8.1%} {result["wins"]:5d} {result["losses"]:5d} '
+                         f'{result["draws"]:5d} {result["goals for"]:6d} {result["goals against"]:6d}')
+        return lines
+
+
+def pairing_jobs(blue, orange, games, seed):
+    # both bots play both sides, games matches in total
+    return [(blue, orange, seed + 2 * i) if i % 2 == 0 else (orange, blue, seed + 2 * i) for i in range(games)]
+
+
+def round_robin(pool, bots, games, seed, standings):
+    jobs = []
+    for number, (first, second) in enumerate(itertools.combinations(bots, 2)):
+        jobs.extend(pairing_jobs(first, second, games, seed + 1000 * number))
+    for result in pool.map(play_match, jobs, chunksize=max(1, len(jobs) // (4 * (os.cpu_count() or 1)))):
+        standings.add(result)
+
+
+def bracket(pool, bots, games, seed, standings):
+    # single elimination, a bye goes to the last bot of an odd round, ties go to goal difference then the higher seed
+    remaining = list(bots)
+    round_number = 1
+    while len(remaining) > 1:
+        pairs = [(remaining[i], remaining[i + 1]) for i in range(0, len(remaining) - 1, 2)]
+        jobs = []
+        for number, (first, second) in enumerate(pairs):
+            jobs.extend(pairing_jobs(first, second, games, seed + 1000 * (100 * round_number + number)))
+        round_standings = Standings(remaining)
+        for result in pool.map(play_match, jobs):
+            standings.add(result)
+            round_standings.add(result)
+        winners = []
+        for first, second in pairs:
+            first_result = round_standings.results[first]
+            second_result = round_standings.results[second]
+            first_key = (first_result['wins'], first_result['goals for'] - first_result['goals against'])
+            second_key = (second_result['wins'], second_result['goals for'] - second_result['goals against'])
+            winners.append(second if second_key > first_key else first)
+            print(f'round {round_number}: {first} vs {second}, {winners[-1]} goes through')
+        if len(remaining) % 2 == 1:
+            winners.append(remaining[-1])
+            print(f'round {round_number}: {remaining[-1]} has a bye')
+        remaining = winners
+        round_number += 1
+    print(f'champion: {remaining[0]}')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Play scripted bots against each other headlessly.')
+    parser.add_argument('bots', nargs='*', default=sorted(BOTS), help=f'bots to enter, from {", ".join(sorted(BOTS))}')
+    parser.add_argument('--format', choices=('round-robin', 'bracket'), default='round-robin')
+    parser.add_argument('--games', type=int, default=10, help='matches per pairing, sides alternate')
+    parser.add_argument('--total-time', type=int, default=45, help='seconds of regulation')
+    parser.add_argument('--physics-rate', type=int, default=PHYSICS_BASE_RATE, help='physics ticks per second')
+    parser.add_argument('--max-overtime', type=float, default=120,
+                        help='seconds of overtime before a match counts as a draw, negative for no limit')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='processes to play matches on')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+    for bot in args.bots:
+        if bot not in BOTS:
+            parser.error(f'unknown bot {bot}')
+        if args.bots.count(bot) > 1:  # standings are kept by name, two entries would be one
+            parser.error(f'{bot} is entered more than once')
+
+    standings = Standings(args.bots)
+    max_overtime = args.max_overtime if args.max_overtime >= 0 else None
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=init_worker,
+                             initargs=(args.total_time, args.physics_rate, max_overtime)) as pool:
+        if args.format == 'bracket':
+            bracket(pool, args.bots, args.games, args.seed, standings)
+        else:
+            round_robin(pool, args.bots, args.games, args.seed, standings)
+    seconds = time.perf_counter() - start
+
+    print('\n'.join(standings.table()))
+    print(f'{standings.matches} matches in {seconds:.2f}s on {args.workers} workers: '
+          f'{standings.matches / seconds:.1f} matches/s, {standings.ticks / seconds:,.0f} ticks/s')
+
+
+if __name__ == '__main__':
+    main()